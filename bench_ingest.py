@@ -0,0 +1,86 @@
+"""Parse benchmark for forecast.json ingest, from response bytes to a cached WeatherReport.
+
+Runs over the forecast payloads recorded in the disk cache, falling back to
+synthetic ones (see bench_model.py) when the cache has none. Each pipeline
+includes producing the text the disk cache stores.
+
+    python bench_ingest.py [--cities 20] [--repeat 5] [--synthetic]
+"""
+import argparse
+import json
+import time
+
+import weather_model
+from bench_model import recorded_payloads, synthetic_payload
+from weather_model import WeatherReport
+
+# Keys WeatherReport.from_json reads, for the key-filtering decoder below
+USED_FIELDS = frozenset((
+    "location", "current", "forecast", "forecastday", "astronomy", "day", "hour", "astro", "condition",
+    "name", "region", "country", "lat", "lon", "tz_id", "localtime", "localtime_epoch",
+    "temp_c", "feelslike_c", "humidity", "wind_kph", "pressure_mb", "vis_km", "is_day", "last_updated_epoch",
+    "code", "text", "icon", "time_epoch", "time", "chance_of_rain", "precip_mm",
+    "date", "maxtemp_c", "mintemp_c", "avgtemp_c", "maxwind_kph", "totalprecip_mm", "avghumidity", "daily_chance_of_rain",
+    "sunrise", "sunset", "moonrise", "moonset", "moon_phase", "moon_illumination"
+))
+filtering_decoder = json.JSONDecoder(object_pairs_hook=lambda pairs: {k: v for k, v in pairs if k in USED_FIELDS})
+
+
+def previous_pipeline(body):
+    # response.json() decodes the text first; the disk cache then re-serialized the dict
+    data = json.loads(body.decode("utf-8"))
+    json.dumps(data)
+    return WeatherReport.from_json(data)
+
+def filtered_pipeline(body):
+    data = filtering_decoder.decode(body.decode("utf-8"))
+    json.dumps(data)
+    return WeatherReport.from_json(data)
+
+def stdlib_pipeline(body):
+    data = json.loads(body)
+    body.decode("utf-8")
+    return WeatherReport.from_json(data)
+
+def current_pipeline(body):
+    data = weather_model.decode_payload(body)
+    body.decode("utf-8")
+    return WeatherReport.from_json(data)
+
+
+def time_per_payload(pipeline, bodies, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies: pipeline(body)
+        best = min(best, time.perf_counter() - start)
+    return best / len(bodies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true", help="ignore payloads recorded in the disk cache")
+    args = parser.parse_args()
+    texts = [] if args.synthetic else recorded_payloads(args.cities)
+    source = "recorded" if texts else "synthetic"
+    if not texts: texts = [json.dumps(synthetic_payload(seed)) for seed in range(args.cities)]
+    bodies = [text.encode("utf-8") for text in texts] # What requests hands over as response.content
+    print(f"{len(bodies)} {source} forecast payloads, {sum(map(len, bodies)) / len(bodies) / 1024:.0f} KiB each")
+
+    pipelines = [
+        ("previous (response.json + dumps)", previous_pipeline),
+        ("stdlib key-filtering hook", filtered_pipeline),
+        ("json.loads(bytes), raw to disk", stdlib_pipeline)
+    ]
+    if weather_model.orjson is not None: pipelines.append(("decode_payload (orjson)", current_pipeline))
+    else: print("orjson not installed; decode_payload uses json.loads")
+    baseline = None
+    for name, pipeline in pipelines:
+        ms = time_per_payload(pipeline, bodies, args.repeat)
+        baseline = baseline or ms
+        print(f"{name:<34} {ms:7.2f} ms per payload   ({baseline / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
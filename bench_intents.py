@@ -0,0 +1,143 @@
+"""Throughput and accuracy benchmark for the chatbot intent matcher.
+
+Builds a labelled corpus of sample questions and runs both the compiled
+matcher (weather_intents.parse) and the old substring chain over it. The
+templated corpus uses phrasings the matcher was written around, so its
+accuracy is an upper bound; HELD_OUT is a hand-labelled set of phrasings
+it was not, scored separately.
+
+    python bench_intents.py [--size 5000] [--seed 7] [--misses]
+"""
+import argparse
+import random
+import re
+import time
+from datetime import date
+
+import weather_intents
+
+TODAY = date(2024, 6, 17) # Fixed so weekday offsets in the corpus are reproducible
+CITIES = ["london", "paris", "new york", "tokyo", "sao paulo", "berlin", "oslo", "cape town",
+          "mexico city", "rio de janeiro", "stratford-upon-avon", "lima", "sydney", "rome"]
+TEMPLATES = {
+    "temperature": ["what is the temperature in {city}{when}?", "how hot is it in {city}{when}",
+                    "how cold will it be in {city}{when}", "temp for {city}{when}"],
+    "rain": ["will it rain in {city}{when}?", "chance of rain for {city}{when}",
+             "do i need an umbrella in {city}{when}", "any precipitation in {city}{when}?"],
+    "wind": ["how windy is it in {city}{when}?", "wind speed in {city}{when}", "is it breezy in {city}{when}"],
+    "sunrise": ["when is sunrise in {city}{when}?", "when does the sun rise in {city}{when}"],
+    "sunset": ["sunset time in {city}{when}", "when does the sun set in {city}{when}?"],
+    "condition": ["what's the weather in {city}{when}?", "forecast for {city}{when}", "what are the conditions in {city}{when}"]
+}
+WHEN = [("", None, None), (" today", 0, None), (" tomorrow", 1, None), (" tomorrow at 6pm", 1, 18),
+        (" at 9am", None, 9), (" this evening", None, 19), (" on sunday", 6, None), (" at 14:00", None, 14)]
+# (text, intent, city, day_offset, hour) as a person would read them, relative to TODAY (a Monday)
+HELD_OUT = [
+    ("Is it going to pour in Dublin tomorrow?", "rain", "dublin", 1, None),
+    ("should I bring a jacket to chicago tonight", "temperature", "chicago", 0, 21),
+    ("what's it like outside in Zürich right now", "condition", "zürich", 0, None),
+    ("São Paulo weather tomorrow", "condition", "são paulo", 1, None),
+    ("how many degrees is it in Kraków?", "temperature", "kraków", None, None),
+    ("Any chance of showers over Seattle this afternoon?", "rain", "seattle", None, 15),
+    ("temperature for münchen on friday", "temperature", "münchen", 4, None),
+    ("when will the sun come up in reykjavík", "sunrise", "reykjavík", None, None),
+    ("what time does it get dark in oslo", "sunset", "oslo", None, None),
+    ("is it gusty in wellington at 3pm", "wind", "wellington", None, 15),
+    ("Weather in New York at 18:30", "condition", "new york", None, 18),
+    ("good morning!", "greeting", None, None, None),
+    ("thanks, that's all", None, None, None, None),
+    ("how warm is it in nice?", "temperature", "nice", None, None),
+    ("rain in lisbon the day after tomorrow", "rain", "lisbon", 2, None),
+    ("forecast for st. petersburg", "condition", "st. petersburg", None, None),
+    ("how cold does it get at night in montréal", "temperature", "montréal", 0, 21),
+    ("is it windy in são tomé", "wind", "são tomé", None, None),
+    ("Hello! What's the temperature in Tokyo?", "temperature", "tokyo", None, None),
+    ("rainfall in mumbai this week", "rain", "mumbai", None, None),
+    ("sunset in cape town on saturday", "sunset", "cape town", 5, None),
+    ("what's the wind doing in chicago tomorrow morning", "wind", "chicago", 1, 9),
+    ("temp in düsseldorf at 7", "temperature", "düsseldorf", None, 7),
+    ("do I need an umbrella today in hong kong", "rain", "hong kong", 0, None),
+    ("how's the weather looking for the weekend in rome", "condition", "rome", 5, None),
+    ("temperature at night", "temperature", None, None, 21),
+    ("is it raining at home?", "rain", None, None, None),
+    ("how windy is it at the moment", "wind", None, None, None),
+    ("temperature at noon", "temperature", None, None, 12),
+    ("will it be cold at work tomorrow", "temperature", None, 1, None),
+    ("what's the weather at sunset", "condition", None, None, None)
+]
+NO_CITY = [("hi", "greeting"), ("hello there", "greeting"), ("which one is this?", None),
+           ("this is great, thanks", None), ("what can you do", None), ("sunny days make me happy", None)]
+
+
+def build_corpus(size, seed):
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < size:
+        if rng.random() < 0.1:
+            text, intent = rng.choice(NO_CITY)
+            corpus.append((text, intent, None, None, None))
+            continue
+        intent = rng.choice(list(TEMPLATES))
+        city = rng.choice(CITIES)
+        when, day_offset, hour = rng.choice(WHEN)
+        text = rng.choice(TEMPLATES[intent]).format(city=city, when=when)
+        if rng.random() < 0.3: text = text.capitalize()
+        corpus.append((text, intent, city, day_offset, hour))
+    return corpus
+
+
+def legacy_parse(message):
+    # The substring chain WeatherChatBot.process_message used before the compiled matcher
+    message = message.lower().strip()
+    match = re.search(r'\b(?:in|for|at)\s+([a-zA-Z\s\-]+)(?:\?|$|\.)', message, re.IGNORECASE)
+    city = match.group(1).strip() if match else None
+    if any(word in message for word in ["hi", "hello", "hey", "greetings"]): intent = "greeting"
+    elif "temperature" in message or "how hot" in message or "how cold" in message: intent = "temperature"
+    elif "rain" in message or "precipitation" in message: intent = "rain"
+    elif "wind" in message: intent = "wind"
+    elif "sun" in message:
+        intent = "sunrise" if "rise" in message else "sunset" if "set" in message else "sun"
+    elif "weather" in message or "forecast" in message: intent = "condition"
+    else: intent = None
+    return weather_intents.Query(intent, city)
+
+
+def run(name, parse, corpus, check_slots, timed=True, misses=False):
+    start = time.perf_counter()
+    results = [parse(text) for text, *_ in corpus]
+    elapsed = time.perf_counter() - start
+    intent_ok = city_ok = full_ok = 0
+    wrong = []
+    for query, (text, intent, city, day_offset, hour) in zip(results, corpus):
+        intent_ok += query.intent == intent
+        city_ok += query.city == city
+        slots_ok = not check_slots or (query.day_offset == day_offset and query.hour == hour)
+        full_ok += query.intent == intent and query.city == city and slots_ok
+        if not (query.intent == intent and query.city == city and slots_ok): wrong.append((text, query))
+    n = len(corpus)
+    speed = f"{n / elapsed:>12,.0f} q/s" if timed else f"{'':>16}"
+    line = f"{name:<10} {speed}   intent {intent_ok / n:6.1%}   city {city_ok / n:6.1%}"
+    if check_slots: line += f"   all slots {full_ok / n:6.1%}"
+    print(line)
+    if misses:
+        for text, query in wrong: print(f"  miss: {text!r} -> {query}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--misses", action="store_true", help="list held-out queries the compiled matcher gets wrong")
+    args = parser.parse_args()
+    corpus = build_corpus(args.size, args.seed)
+    print(f"{len(corpus)} templated queries")
+    run("legacy", legacy_parse, corpus, check_slots=False)
+    run("compiled", lambda text: weather_intents.parse(text, today=TODAY), corpus, check_slots=True)
+    print(f"{len(HELD_OUT)} held-out queries")
+    run("legacy", legacy_parse, HELD_OUT, check_slots=False, timed=False)
+    run("compiled", lambda text: weather_intents.parse(text, today=TODAY), HELD_OUT, check_slots=True,
+        timed=False, misses=args.misses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Memory per cached city: raw forecast.json dicts vs the typed WeatherReport.
+
+Uses the forecast payloads recorded in the disk cache when there are any,
+otherwise synthetic payloads shaped like weatherapi's forecast.json.
+
+    python bench_model.py [--cities 20] [--synthetic]
+"""
+import argparse
+import gc
+import json
+import random
+import sqlite3
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from weather_cache import DiskCache
+from weather_model import WeatherReport
+
+CONDITIONS = [(1000, "Sunny", "113"), (1003, "Partly cloudy", "116"), (1006, "Cloudy", "119"),
+              (1063, "Patchy rain possible", "176"), (1183, "Light rain", "296"), (1195, "Heavy rain", "308")]
+START_DAY = date(2024, 6, 17)
+START_EPOCH = 1718582400 # 2024-06-17 00:00 UTC
+
+
+def _condition(rng, is_day=1):
+    code, text, icon = rng.choice(CONDITIONS)
+    return {"text": text, "icon": f"//cdn.weatherapi.com/weather/64x64/{'day' if is_day else 'night'}/{icon}.png", "code": code}
+
+def synthetic_payload(seed, days=7):
+    # Same field set as a real forecast.json response, so the raw-dict baseline is honest
+    rng = random.Random(seed)
+    astro = lambda: {"sunrise": "04:43 AM", "sunset": "09:21 PM", "moonrise": "03:12 PM", "moonset": "01:55 AM",
+                     "moon_phase": "Waxing Gibbous", "moon_illumination": rng.randint(0, 100),
+                     "is_moon_up": 0, "is_sun_up": 0}
+    forecastday = []
+    for d in range(days):
+        day = START_DAY + timedelta(days=d)
+        hours = []
+        for h in range(24):
+            is_day = int(6 <= h < 21)
+            temp = round(rng.uniform(8, 28), 1)
+            hours.append({
+                "time_epoch": START_EPOCH + (d * 24 + h) * 3600, "time": f"{day.isoformat()} {h:02d}:00",
+                "temp_c": temp, "temp_f": round(temp * 9 / 5 + 32, 1), "is_day": is_day, "condition": _condition(rng, is_day),
+                "wind_mph": round(rng.uniform(0, 20), 1), "wind_kph": round(rng.uniform(0, 32), 1), "wind_degree": rng.randint(0, 359),
+                "wind_dir": rng.choice(["N", "NE", "E", "SE", "S", "SW", "W", "NW"]), "pressure_mb": float(rng.randint(990, 1030)),
+                "pressure_in": round(rng.uniform(29.2, 30.4), 2), "precip_mm": round(rng.uniform(0, 3), 2), "precip_in": round(rng.uniform(0, 0.1), 2),
+                "snow_cm": 0.0, "humidity": rng.randint(30, 100), "cloud": rng.randint(0, 100), "feelslike_c": temp, "feelslike_f": temp,
+                "windchill_c": temp, "windchill_f": temp, "heatindex_c": temp, "heatindex_f": temp, "dewpoint_c": round(temp - 5, 1),
+                "dewpoint_f": temp, "will_it_rain": rng.randint(0, 1), "chance_of_rain": rng.randint(0, 100), "will_it_snow": 0,
+                "chance_of_snow": 0, "vis_km": 10.0, "vis_miles": 6.0, "gust_mph": round(rng.uniform(0, 30), 1),
+                "gust_kph": round(rng.uniform(0, 48), 1), "uv": float(rng.randint(0, 8))
+            })
+        temps = [hour["temp_c"] for hour in hours]
+        forecastday.append({
+            "date": day.isoformat(), "date_epoch": START_EPOCH + d * 86400,
+            "day": {"maxtemp_c": max(temps), "maxtemp_f": max(temps), "mintemp_c": min(temps), "mintemp_f": min(temps),
+                    "avgtemp_c": round(sum(temps) / 24, 1), "avgtemp_f": 0.0, "maxwind_mph": 0.0, "maxwind_kph": max(h["wind_kph"] for h in hours),
+                    "totalprecip_mm": round(sum(h["precip_mm"] for h in hours), 2), "totalprecip_in": 0.0, "totalsnow_cm": 0.0,
+                    "avgvis_km": 10.0, "avgvis_miles": 6.0, "avghumidity": rng.randint(40, 90), "daily_will_it_rain": 1,
+                    "daily_chance_of_rain": rng.randint(0, 100), "daily_will_it_snow": 0, "daily_chance_of_snow": 0,
+                    "condition": _condition(rng), "uv": 5.0},
+            "astro": astro(), "hour": hours
+        })
+    current = dict(forecastday[0]["hour"][12])
+    for key in ("time_epoch", "time", "will_it_rain", "chance_of_rain", "will_it_snow", "chance_of_snow", "snow_cm"): current.pop(key)
+    current.update({"last_updated_epoch": START_EPOCH + 12 * 3600, "last_updated": f"{START_DAY.isoformat()} 12:00"})
+    return {
+        "location": {"name": f"City {seed}", "region": "", "country": "Nowhere", "lat": 51.52, "lon": -0.11, "tz_id": "Europe/London",
+                     "localtime_epoch": START_EPOCH + 12 * 3600, "localtime": f"{START_DAY.isoformat()} 12:00"},
+        "current": current, "forecast": {"forecastday": forecastday}
+    }
+
+def recorded_payloads(limit):
+    try:
+        disk = DiskCache()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Disk cache unavailable ({e}), using synthetic payloads.")
+        return []
+    rows = disk.payloads(("forecast",), limit)
+    disk.close()
+    return [payload for _, _, payload in rows]
+
+
+def retained_bytes(build, texts):
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(text) for text in texts]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--synthetic", action="store_true", help="ignore payloads recorded in the disk cache")
+    args = parser.parse_args()
+    texts = [] if args.synthetic else recorded_payloads(args.cities)
+    source = "recorded" if texts else "synthetic"
+    if not texts: texts = [json.dumps(synthetic_payload(seed)) for seed in range(args.cities)]
+    print(f"{len(texts)} {source} forecast payloads, {sum(map(len, texts)) / len(texts) / 1024:.0f} KiB of JSON each")
+
+    raw = retained_bytes(json.loads, texts)
+    WeatherReport.from_json(json.loads(texts[0])) # Fill the shared condition table first
+    model = retained_bytes(lambda text: WeatherReport.from_json(json.loads(text)), texts)
+    print(f"raw dicts  {raw / len(texts) / 1024:8.1f} KiB per city")
+    print(f"report     {model / len(texts) / 1024:8.1f} KiB per city   ({raw / max(model, 1):.0f}x smaller)")
+
+    start = time.perf_counter()
+    for text in texts: WeatherReport.from_json(json.loads(text))
+    print(f"ingest     {(time.perf_counter() - start) / len(texts) * 1000:8.2f} ms per payload (json.loads + model)")
+
+
+if __name__ == "__main__":
+    main()
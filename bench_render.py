@@ -0,0 +1,87 @@
+"""Render time of the table tabs: the old destroy/rebuild path vs RowPool.
+
+The old update_hourly_tab/update_daily_tab destroyed every child of the
+scroll frame and built a header plus one frame with four labels per row.
+RowPool (waether.py) creates the rows once and only re-texts labels whose
+text changed. Each render is timed through update_idletasks(), so widget
+creation, destruction and geometry management are included. The root is
+withdrawn by default; --show maps it so redraws are counted as well.
+Needs a display (on a headless box: xvfb-run python bench_render.py).
+
+    python bench_render.py [--rows 7 24] [--repeat 30] [--show]
+"""
+import argparse
+import statistics
+import time
+
+import customtkinter as ctk
+
+from waether import TEXT_COLOR, RowPool, build_table_header, row_color
+
+COLUMNS = [("Date", 120, 'w', False), ("Temp (°C)", 120, 'w', True), ("Condition", None, 'w', False), ("Rain (%)", 80, 'center', False)]
+CONDITIONS = ["Sunny", "Partly cloudy", "Patchy rain possible", "Light rain", "Overcast"]
+
+
+def sample_rows(count, seed):
+    return [(f"Day {seed}-{i:02d}", f"{10 + (i + seed) % 15}° / {20 + (i * seed) % 10}°",
+             CONDITIONS[(i + seed) % len(CONDITIONS)], f"{(i * 13 + seed * 7) % 100}%") for i in range(count)]
+
+
+def legacy_render(scroll, rows):
+    # The pre-RowPool tab body: destroy everything, then build header and rows from scratch
+    for widget in scroll.winfo_children(): widget.destroy()
+    build_table_header(scroll, COLUMNS).pack(fill="x", pady=(0, 5), padx=5)
+    for index, values in enumerate(rows):
+        frame = ctk.CTkFrame(scroll, corner_radius=6, fg_color=row_color(index))
+        frame.pack(fill="x", pady=2, padx=5)
+        for (title, width, anchor, bold), text in zip(COLUMNS, values):
+            font = ("Arial", 14, "bold") if bold else ("Arial", 14)
+            if width:
+                ctk.CTkLabel(frame, text=text, width=width, font=font, text_color=TEXT_COLOR, anchor=anchor).pack(side="left", padx=10, pady=4)
+            else:
+                ctk.CTkLabel(frame, text=text, font=font, text_color=TEXT_COLOR, anchor=anchor,
+                             justify='left').pack(side="left", padx=10, pady=4, fill='x', expand=True)
+
+
+def time_renders(root, render, datasets, repeat):
+    # Median ms per render, cycling through datasets (one dataset = every re-render is a no-op change)
+    render(datasets[0])
+    root.update_idletasks()
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        render(datasets[(i + 1) % len(datasets)])
+        root.update_idletasks()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[7, 24], help="7 = daily tab, 24 = old hourly tab")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--show", action="store_true", help="map the window so drawing is timed too")
+    args = parser.parse_args()
+    root = ctk.CTk()
+    root.geometry("900x700")
+    if not args.show: root.withdraw()
+    print(f"widget scaling {ctk.ScalingTracker.get_widget_scaling(root):g}, window {'shown' if args.show else 'withdrawn'}")
+
+    for count in args.rows:
+        changed = [sample_rows(count, 1), sample_rows(count, 2)]
+        cases = [("new data", changed), ("same data", changed[:1])]
+        for label, datasets in cases:
+            legacy_scroll = ctk.CTkScrollableFrame(root)
+            legacy_scroll.pack(fill="both", expand=True)
+            legacy = time_renders(root, lambda rows: legacy_render(legacy_scroll, rows), datasets, args.repeat)
+            legacy_scroll.destroy()
+            pool_scroll = ctk.CTkScrollableFrame(root)
+            pool_scroll.pack(fill="both", expand=True)
+            pool = RowPool(pool_scroll, COLUMNS)
+            pooled = time_renders(root, pool.render, datasets, args.repeat)
+            pool_scroll.destroy()
+            print(f"{count:>4} rows, {label:<9}  rebuild {legacy:8.2f} ms   RowPool {pooled:8.2f} ms   ({legacy / max(pooled, 1e-6):.0f}x)")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Cross-check the local astronomy engine against reference astro data.
+
+Compares all six fields of weather_astro's output (sunrise, sunset, moonrise,
+moonset, phase, illumination) with the astronomy.json-shaped blocks in
+check_astro_fixtures.json, then with any astro blocks recorded in the disk
+cache (forecast.json days and astronomy.json responses), then with a few
+published reference values. Exits non-zero if anything is out of tolerance.
+
+    python check_astro.py [--sun-tolerance 3] [--moon-tolerance 10] [--fixtures PATH]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import date
+
+import weather_astro
+from weather_cache import DiskCache
+from weather_model import EPOCH_ORDINAL, WeatherReport, local_seconds
+
+ILLUMINATION_TOLERANCE = 5 # Percentage points
+TIME_FIELDS = ("sunrise", "sunset", "moonrise", "moonset")
+ALL_FIELDS = TIME_FIELDS + ("moon_phase", "moon_illumination")
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "check_astro_fixtures.json")
+
+# (place, lat, lon, tz_id, date, field, expected); published NOAA / USNO times
+REFERENCES = [
+    ("London", 51.5074, -0.1278, "Europe/London", date(2024, 6, 21), "sunrise", "04:43 AM"),
+    ("London", 51.5074, -0.1278, "Europe/London", date(2024, 6, 21), "sunset", "09:21 PM"),
+    ("New York", 40.7128, -74.0060, "America/New_York", date(2024, 12, 21), "sunrise", "07:16 AM"),
+    ("New York", 40.7128, -74.0060, "America/New_York", date(2024, 12, 21), "sunset", "04:32 PM"),
+    ("Sydney", -33.8688, 151.2093, "Australia/Sydney", date(2024, 6, 21), "sunrise", "07:00 AM"),
+    ("Sydney", -33.8688, 151.2093, "Australia/Sydney", date(2024, 6, 21), "sunset", "04:53 PM"),
+    ("Tromso", 69.6492, 18.9553, "Europe/Oslo", date(2024, 6, 21), "sunrise", "No sunrise"),
+    ("Greenwich", 51.4769, 0.0, "UTC", date(2024, 6, 22), "moon_phase", "Full Moon"),
+    ("Greenwich", 51.4769, 0.0, "UTC", date(2024, 7, 6), "moon_phase", "New Moon"),
+    ("Greenwich", 51.4769, 0.0, "UTC", date(2024, 6, 14), "moon_phase", "First Quarter"),
+    ("Greenwich", 51.4769, 0.0, "UTC", date(2024, 6, 28), "moon_phase", "Last Quarter")
+]
+
+
+class _Place:
+    # Just enough of weather_model.Location for weather_astro.astro_for
+    def __init__(self, lat, lon, tz_id):
+        self.lat, self.lon, self.tz_id, self.utc_offset = lat, lon, tz_id, None
+
+
+def minutes_of(text):
+    # "hh:mm AM" -> minutes after midnight; None for "No sunrise" and the like
+    try: hour, minute = int(text[0:2]), int(text[3:5])
+    except ValueError: return None
+    return hour % 12 * 60 + minute + (720 if text.strip().upper().endswith("PM") else 0)
+
+def compare(field, expected, actual, sun_tolerance, moon_tolerance):
+    # -> error text, or None when within tolerance
+    if field in TIME_FIELDS:
+        want, got = minutes_of(str(expected)), minutes_of(str(actual))
+        if want is None or got is None:
+            # "No sunrise", "No moonset", ...: both sides must agree there is no event
+            return None if (want is None) == (got is None) else f"{expected!r} vs {actual!r}"
+        diff = abs(want - got)
+        diff = min(diff, 1440 - diff)
+        limit = sun_tolerance if field.startswith("sun") else moon_tolerance
+        return None if diff <= limit else f"{expected} vs {actual} ({diff} min)"
+    if field == "moon_illumination":
+        diff = abs(float(expected) - float(actual))
+        return None if diff <= ILLUMINATION_TOLERANCE else f"{expected}% vs {actual}%"
+    names = weather_astro.PHASE_NAMES
+    if expected not in names: return None # An API phase label we do not model
+    steps = abs(names.index(expected) - names.index(actual))
+    # Phase names change within hours of a boundary, so a neighbouring name is accepted
+    return None if min(steps, len(names) - steps) <= 1 else f"{expected} vs {actual}"
+
+
+def astro_blocks(label, endpoint, data):
+    # -> (label, Location, local day number, astro dict) for each astro block in one response
+    location = WeatherReport.from_json({"location": data.get("location", {})}).location
+    if endpoint == "astronomy":
+        seconds = local_seconds(location.localtime)
+        if seconds is None or "astro" not in data.get("astronomy", {}): return []
+        return [(label, location, seconds // 86400, data["astronomy"]["astro"])]
+    blocks = []
+    for day in data.get("forecast", {}).get("forecastday", []):
+        seconds = local_seconds(day.get("date", ""))
+        if seconds is not None and "astro" in day: blocks.append((label, location, seconds // 86400, day["astro"]))
+    return blocks
+
+def fixture_blocks(path):
+    with open(path, encoding="utf-8") as f: responses = json.load(f)["responses"]
+    blocks = []
+    for data in responses: blocks += astro_blocks(data["location"]["name"], "astronomy", data)
+    return blocks
+
+def recorded_blocks():
+    try:
+        disk = DiskCache()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Disk cache unavailable: {e}")
+        return []
+    rows = disk.payloads(("forecast", "astronomy"))
+    disk.close()
+    blocks = []
+    for query, endpoint, payload in rows:
+        try: data = json.loads(payload)
+        except ValueError: continue
+        blocks += astro_blocks(query, endpoint, data)
+    return blocks
+
+def check_blocks(blocks, args, worst):
+    # -> (checked, failures); worst collects the largest time difference per field
+    checked = failures = 0
+    for label, location, day, astro in blocks:
+        local = weather_astro.astro_for(location, [day])[0]
+        if local is None: continue
+        for field in ALL_FIELDS:
+            if field not in astro: continue
+            checked += 1
+            error = compare(field, astro[field], getattr(local, field), args.sun_tolerance, args.moon_tolerance)
+            if error:
+                failures += 1
+                print(f"  {label} {date.fromordinal(day + EPOCH_ORDINAL)} {field}: {error}")
+            if field in TIME_FIELDS:
+                want, got = minutes_of(str(astro[field])), minutes_of(str(getattr(local, field)))
+                if want is not None and got is not None:
+                    diff = min(abs(want - got), 1440 - abs(want - got))
+                    worst[field] = max(worst.get(field, 0), diff)
+            elif field == "moon_illumination":
+                worst[field] = max(worst.get(field, 0), abs(float(astro[field]) - float(local.moon_illumination)))
+    return checked, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sun-tolerance", type=int, default=3, help="minutes")
+    parser.add_argument("--moon-tolerance", type=int, default=10, help="minutes")
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    args = parser.parse_args()
+    checked = failures = 0
+
+    for name, blocks in (("fixture", fixture_blocks(args.fixtures)), ("recorded", recorded_blocks())):
+        print(f"{len(blocks)} {name} astro blocks")
+        worst = {}
+        counts = check_blocks(blocks, args, worst)
+        checked, failures = checked + counts[0], failures + counts[1]
+        if worst: print("  worst difference: " + ", ".join(f"{field} {value:g}{'%' if field == 'moon_illumination' else ' min'}"
+                                                          for field, value in worst.items()))
+
+    print(f"{len(REFERENCES)} reference values")
+    for place, lat, lon, tz_id, day, field, expected in REFERENCES:
+        local = weather_astro.astro_for(_Place(lat, lon, tz_id), [day.toordinal() - EPOCH_ORDINAL])[0]
+        checked += 1
+        error = compare(field, expected, getattr(local, field), args.sun_tolerance, args.moon_tolerance)
+        if error:
+            failures += 1
+            print(f"  {place} {day} {field}: {error}")
+
+    print(f"{checked - failures}/{checked} within tolerance")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import time
+STARTUP_T0 = time.perf_counter() # Taken before the heavy GUI imports so first-paint time includes them
+
 from PIL import Image, ImageTk
 import customtkinter as ctk
 import requests
@@ -5,9 +8,31 @@ from datetime import datetime
 import re
 import os
 import sys
+import queue
+import threading
+import bisect
+import math
+import tkinter.font as tkfont
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 import os
-from config import API_KEY # <-- This gets your secret key
+try:
+    from config import API_KEY # <-- This gets your secret key
+except ImportError:
+    API_KEY = None # verify_api_key reports it; tools like bench_render.py only need the widgets
+from weather_client import KEY_ERROR_CODES, RateLimitedError, api_error_code, get_client, is_quota_error
+from weather_cache import normalize_location
+import weather_intents
+import weather_model
+try:
+    import weather_analytics # Needs numpy; the Daily tab and chatbot skip derived metrics without it
+except ImportError:
+    weather_analytics = None
+try:
+    import weather_astro # Needs numpy; without it astro data comes from the API
+except ImportError:
+    weather_astro = None
 
 # This finds your new 'assets' folder automatically!
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,6 +41,10 @@ ICON_PATHS = {
     'sun': os.path.join(script_dir, "assets", "sun.png"),
     'moon': os.path.join(script_dir, "assets", "moon.png")
 }
+# Optional weatherapi condition icon set, laid out like the CDN: assets/icons/day/113.png, assets/icons/night/113.png
+CONDITION_ICON_DIR = os.path.join(script_dir, "assets", "icons")
+ICON_DECODED_LIMIT = 48 # Decoded PIL images kept in memory
+ICON_IMAGE_LIMIT = 96 # CTkImages kept across (icon, size) pairs
 
 # --- Color Scheme ---
 MAIN_BG = "#87CEEB" # Light Sky Blue
@@ -26,60 +55,113 @@ USER_MSG_BG = "#E0F7FA" # Very light cyan for user chat messages
 BOT_MSG_BG = "#FFFFFF" # White for bot chat messages
 CHAT_HISTORY_BG = "#F0F8FF" # AliceBlue (light background for chat history)
 
+# --- Background Work ---
+FETCH_WORKERS = 4 # Threads available for network fetches
+UI_POLL_MS = 50 # How often the UI thread drains results posted by workers
+SEARCH_ENDPOINTS = ("current", "forecast", "astronomy")
+ENDPOINT_TIMEOUTS = {"current": 8, "forecast": 15, "astronomy": 8} # Seconds per request
+CONNECTION_CHECK_TIMEOUT = 10
+DEFAULT_PROBE_CITY = "London" # Used to validate the key when there is no previous search to refresh
+SINGLE_REQUEST_MODE = True # Derive current and astronomy data from one forecast.json call instead of three calls
+
+# --- Background Image Scaling ---
+BG_SETTLE_MS = 150 # Quiet period after the last resize before the high-quality pass
+BG_SCALE_CACHE_SIZE = 4 # Recently used window sizes kept as ready CTkImages
+BG_MIP_MIN_SIDE = 256 # Smallest pyramid level kept for draft scaling
+
+# --- Virtualized Lists ---
+VIRTUAL_OVERSCAN = 4 # Extra rows kept bound above and below the viewport
+VIRTUAL_ROW_GAP = 4 # Pixels between rows
+VIRTUAL_SCROLL_STEP = 12 # Pixels per scroll unit
+VIRTUAL_WHEEL_UNITS = 3 # Scroll units per mouse wheel notch
+
+# --- Chat Log ---
+CHAT_HISTORY_LIMIT = 500 # Messages kept; older ones are dropped from the ring buffer
+CHAT_RESIZE_DEBOUNCE_MS = 120
+CHAT_FONT = ("Arial", 14)
+CHAT_PENDING_TEXT = "Bot: ⏳ Looking that up..."
+
 # --- CTk Settings ---
 ctk.set_appearance_mode("Light")
 ctk.set_default_color_theme("blue")
 
-# --- WeatherChatBot Class (No changes) ---
+# --- Payload Helpers ---
+def search_endpoints():
+    if SINGLE_REQUEST_MODE: return ("forecast",)
+    # With the local astronomy engine the astronomy.json call is skipped entirely
+    return tuple(ep for ep in SEARCH_ENDPOINTS if ep != "astronomy" or weather_astro is None)
+
+def astro_for_day(report, day_offset=0):
+    # The payload's own astro block when it has one for that day, otherwise computed locally
+    if report is None: return None
+    day_offset = day_offset or 0
+    if report.daily is not None:
+        row = report.day(day_offset)
+        if row is not None and report.daily.astro[row] is not None: return report.daily.astro[row]
+    elif day_offset == 0 and report.astro is not None:
+        return report.astro
+    if weather_astro is None or report.location is None or report.today is None: return None
+    day = report.today.toordinal() - weather_model.EPOCH_ORDINAL + day_offset
+    return weather_astro.astro_for(report.location, [day])[0]
+
+def format_age(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 60: return f"{max(minutes, 1)} min"
+    if minutes < 24 * 60: return f"{minutes // 60} h"
+    return f"{minutes // (24 * 60)} day(s)"
+
+# --- WeatherChatBot Class ---
 class WeatherChatBot:
     def __init__(self, weather_app):
         self.app = weather_app
 
-    def process_message(self, message):
-        message = message.lower().strip()
+    def process_message(self, message, default_city=None):
+        # May run on a worker thread: default_city is captured on the UI thread by the caller
+        query = weather_intents.parse(message)
         response = ""
-        city_to_query = None
-
-        extracted_city = self._extract_city(message)
-        if extracted_city:
-            city_to_query = extracted_city
-        elif self.app.last_city:
-            city_to_query = self.app.last_city
-        else:
-            if any(word in message for word in ["temperature", "rain", "wind", "sun", "weather"]):
-                 return "Please specify a city first (e.g., 'temperature in London' or search for a city)."
+        if default_city is None: default_city = self.app.last_city
+        city_to_query = query.city or default_city
+        if not city_to_query and query.needs_city:
+            return "Please specify a city first (e.g., 'temperature in London' or search for a city)."
+        if query.weekday is not None and city_to_query:
+            # parse() counted the weekday from this machine's date; the forecast counts from the city's
+            report = self._forecast_report(city_to_query)
+            if report is not None and report.today is not None: query.day_offset = query.offset_on(report.today)
 
-        if any(word in message for word in ["hi", "hello", "hey", "greetings"]):
+        if query.intent == "greeting":
             response = "Hello! How can I help you with the weather today?"
 
-        elif "temperature" in message or "how hot" in message or "how cold" in message:
-            if city_to_query:
+        elif query.intent == "temperature":
+            if city_to_query and self._is_forecast_query(query):
+                response = self._answer_forecast(city_to_query, query)
+            elif city_to_query:
                 temp = self._get_current_data(city_to_query, 'temp_c')
                 response = f"The current temperature in {city_to_query.capitalize()} is {temp}°C." if temp != "N/A" else f"Sorry, I couldn't get the temperature for {city_to_query.capitalize()}."
 
-        elif "rain" in message or "precipitation" in message:
+        elif query.intent == "rain":
             if city_to_query:
-                chance = self._get_forecast_data(city_to_query, 'daily_chance_of_rain')
-                response = f"The chance of rain in {city_to_query.capitalize()} today is {chance}%." if chance != "N/A" else f"Sorry, I couldn't get the rain forecast for {city_to_query.capitalize()}."
+                response = self._answer_forecast(city_to_query, query)
 
-        elif "wind" in message:
-            if city_to_query:
+        elif query.intent == "wind":
+            if city_to_query and self._is_forecast_query(query):
+                response = self._answer_forecast(city_to_query, query)
+            elif city_to_query:
                 wind = self._get_current_data(city_to_query, 'wind_kph')
                 response = f"The current wind speed in {city_to_query.capitalize()} is {wind} km/h." if wind != "N/A" else f"Sorry, I couldn't get the wind speed for {city_to_query.capitalize()}."
 
-        elif "sun" in message:
+        elif query.intent in ("sunrise", "sunset", "sun"):
             if city_to_query:
-                if "rise" in message:
-                    time = self._get_astro_data(city_to_query, 'sunrise')
-                    response = f"Sunrise in {city_to_query.capitalize()} is at {time}." if time != "N/A" else f"Sorry, I couldn't get the sunrise time for {city_to_query.capitalize()}."
-                elif "set" in message:
-                    time = self._get_astro_data(city_to_query, 'sunset')
-                    response = f"Sunset in {city_to_query.capitalize()} is at {time}." if time != "N/A" else f"Sorry, I couldn't get the sunset time for {city_to_query.capitalize()}."
-                else:
+                if query.intent == "sun":
                      response = "Are you asking about sunrise or sunset?"
+                else:
+                    label = "Sunrise" if query.intent == "sunrise" else "Sunset"
+                    time, when = self._get_astro_data(city_to_query, query.intent, query.day_offset)
+                    response = f"{label} in {city_to_query.capitalize()}{when} is at {time}." if time != "N/A" else f"Sorry, I couldn't get the {query.intent} time for {city_to_query.capitalize()}."
 
-        elif "weather" in message or "forecast" in message:
-             if city_to_query:
+        elif query.intent == "condition":
+             if city_to_query and self._is_forecast_query(query):
+                 response = self._answer_forecast(city_to_query, query)
+             elif city_to_query:
                  condition = self._get_current_data(city_to_query, 'condition', sub_key='text')
                  response = f"The current condition in {city_to_query.capitalize()} is '{condition}'." if condition != "N/A" else f"Sorry, I couldn't get the current conditions for {city_to_query.capitalize()}."
 
@@ -88,50 +170,557 @@ class WeatherChatBot:
 
         return response
 
-    def _extract_city(self, message):
-        match = re.search(r'\b(?:in|for|at)\s+([a-zA-Z\s\-]+)(?:\?|$|\.)', message, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-        return None
-
     def _fetch_helper(self, city, endpoint):
         try:
-            if city == self.app.last_city:
-                 if endpoint == "current" and self.app.current_data: return self.app.current_data
-                 if endpoint == "forecast" and self.app.forecast_data: return self.app.forecast_data
-                 if endpoint == "astronomy" and self.app.astro_data: return self.app.astro_data
-            return self.app.fetch_weather_data(city, endpoint)
+            # Repeat questions are answered from the client's response cache; a forecast
+            # report also carries the current and astro records
+            return self.app.fetch_weather_data(city, "forecast" if SINGLE_REQUEST_MODE else endpoint)
         except Exception as e:
             print(f"Chatbot fetch error for {city} ({endpoint}): {e}")
             if self.app and hasattr(self.app, '_add_chat_message'):
-                 self.app._add_chat_message(f"Bot: ❌ Sorry, couldn't fetch {endpoint} data for {city.capitalize()}.", is_user=False)
+                 self.app.post_to_ui(self.app._add_chat_message, f"Bot: ❌ Sorry, couldn't fetch {endpoint} data for {city.capitalize()}.", False)
             return None
 
     def _get_current_data(self, city, field, sub_key=None):
-        data = self._fetch_helper(city, "current")
-        if data and 'current' in data:
-            if sub_key:
-                 if field in data['current'] and isinstance(data['current'][field], dict) and sub_key in data['current'][field]:
-                      return data['current'][field][sub_key]
-            elif field in data['current']:
-                return data['current'][field]
-        return "N/A"
-
-    def _get_forecast_data(self, city, field):
-        data = self._fetch_helper(city, "forecast")
-        if data and 'forecast' in data and 'forecastday' in data['forecast'] and len(data['forecast']['forecastday']) > 0:
-            today_forecast = data['forecast']['forecastday'][0]
-            if 'day' in today_forecast and field in today_forecast['day']:
-                 return today_forecast['day'][field]
-        return "N/A"
-
-    def _get_astro_data(self, city, field):
-        data = self._fetch_helper(city, "astronomy")
-        if data and 'astronomy' in data and 'astro' in data['astronomy'] and field in data['astronomy']['astro']:
-             return data['astronomy']['astro'][field]
-        return "N/A"
-
-# --- WeatherApp Class (Changes in color usage) ---
+        report = self._fetch_helper(city, "current")
+        if report is None or report.current is None: return "N/A"
+        value = getattr(report.current, field, None)
+        if sub_key: value = getattr(value, sub_key, None)
+        return weather_model.format_value(value, "N/A")
+
+    def _is_forecast_query(self, query):
+        # "now"/"today" with no hour still means the live reading
+        return query.hour is not None or bool(query.day_offset)
+
+    def _forecast_report(self, city):
+        report = self._fetch_helper(city, "forecast")
+        return report if report is not None and report.daily is not None else None
+
+    def _answer_forecast(self, city, query):
+        # Day and hour rows are found by arithmetic on the cached report: no refetch, no scan
+        name = city.capitalize()
+        report = self._forecast_report(city)
+        if report is None: return f"Sorry, I couldn't get the forecast for {name}."
+        value = weather_model.format_value
+        offset = query.day_offset or 0
+        hour = query.hour
+        when = report.describe(offset, hour)
+        if hour is not None:
+            row, hourly = report.hour(offset, hour), report.hourly
+            if row is None: return f"Sorry, I don't have an hourly forecast for {name} {when}."
+            if query.intent == "temperature":
+                return f"The temperature in {name} {when} is expected to be {value(hourly.temp_c[row], 'N/A')}°C."
+            if query.intent == "rain":
+                return f"The chance of rain in {name} {when} is {hourly.chance_of_rain[row]}%."
+            if query.intent == "wind":
+                return f"The wind speed in {name} {when} is expected to be {value(hourly.wind_kph[row], 'N/A')} km/h."
+            return f"The condition in {name} {when} is expected to be '{hourly.condition_at(row).text}'."
+        row, daily = report.day(offset), report.daily
+        if row is None:
+            return f"Sorry, I only have a {len(daily)}-day forecast for {name}." if len(daily) else f"Sorry, I couldn't get the forecast for {name}."
+        summary = weather_analytics.daily_summary(report) if weather_analytics is not None else None
+        index = weather_analytics.summary_row(summary, daily, row) if summary is not None else None
+        if index is not None and math.isnan(summary.mean_temp[index]): index = None
+        if query.intent == "temperature":
+            answer = f"The temperature in {name} {when} will range from {value(daily.mintemp_c[row], 'N/A')}°C to {value(daily.maxtemp_c[row], 'N/A')}°C"
+            if index is None: return answer + "."
+            return answer + f", feeling like {summary.min_feels_like[index]:.0f}°C to {summary.max_feels_like[index]:.0f}°C."
+        if query.intent == "rain":
+            answer = f"The chance of rain in {name} {when} is {daily.chance_of_rain[row]}%"
+            if index is None: return answer + "."
+            return answer + f", with about {summary.rain_hours[index]} hour(s) of rain expected."
+        if query.intent == "wind":
+            answer = f"The wind in {name} {when} will peak at {value(daily.maxwind_kph[row], 'N/A')} km/h"
+            if index is None or summary.min_wind_chill[index] >= summary.min_temp[index] - 0.5: return answer + "."
+            return answer + f", with a wind chill down to {summary.min_wind_chill[index]:.0f}°C."
+        return f"The forecast for {name} {when} is '{daily.condition_at(row).text}'."
+
+    def _get_astro_data(self, city, field, day_offset=None):
+        # -> (value, " tomorrow"-style suffix); any cached report with a location will do when
+        # astro data can be computed locally, so this never costs an astronomy.json call
+        report = self._fetch_helper(city, "current" if weather_astro is not None else "astronomy")
+        astro = astro_for_day(report, day_offset)
+        when = f" {report.describe(day_offset)}" if day_offset and report is not None else ""
+        return (getattr(astro, field, "N/A") if astro else "N/A"), when
+
+# --- IconRegistry Class ---
+class IconRegistry:
+    # Decodes each icon file once and keeps one CTkImage per (icon, size), both LRU-bounded
+    def __init__(self, paths, condition_dir=CONDITION_ICON_DIR, decoded_limit=ICON_DECODED_LIMIT, image_limit=ICON_IMAGE_LIMIT):
+        self.paths = dict(paths)
+        self.condition_dir = condition_dir
+        self.decoded_limit = decoded_limit
+        self.image_limit = image_limit
+        self._decoded = OrderedDict()
+        self._images = OrderedDict()
+        self._missing = set()
+        self._lock = threading.Lock()
+
+    def preload(self, names):
+        # Safe to call from a worker thread: only PIL decoding happens here
+        for name in names: self._decode(name)
+
+    def get(self, name, size):
+        # Must be called on the UI thread since it may build a CTkImage
+        key = (name, tuple(size))
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+        decoded = self._decode(name)
+        if decoded is None: return None
+        image = ctk.CTkImage(light_image=decoded, size=key[1])
+        self._images[key] = image
+        while len(self._images) > self.image_limit: self._images.popitem(last=False)
+        return image
+
+    def condition_icon(self, icon_url, is_day):
+        # weatherapi's condition.icon is e.g. "//cdn.weatherapi.com/weather/64x64/day/113.png"
+        fallback = 'sun' if is_day else 'moon'
+        match = re.search(r'(day|night)/(\d+)\.png$', icon_url or '')
+        if not match: return fallback
+        name = f"{match.group(1)}/{match.group(2)}"
+        if name not in self.paths:
+            if name in self._missing: return fallback
+            path = os.path.join(self.condition_dir, match.group(1), f"{match.group(2)}.png")
+            if not os.path.exists(path):
+                self._missing.add(name)
+                return fallback
+            self.paths[name] = path
+        return name
+
+    def _decode(self, name):
+        with self._lock:
+            if name in self._decoded:
+                self._decoded.move_to_end(name)
+                return self._decoded[name]
+        path = self.paths.get(name)
+        if not path or not os.path.exists(path): return None
+        try:
+            with Image.open(path) as img:
+                decoded = img.convert("RGBA")
+        except Exception as e:
+            print(f"Error loading icon '{path}': {e}")
+            return None
+        with self._lock:
+            self._decoded[name] = decoded
+            while len(self._decoded) > self.decoded_limit: self._decoded.popitem(last=False)
+        return decoded
+
+# --- Table Helpers ---
+# columns: (title, width or None to expand, anchor, bold)
+def build_table_header(parent, columns):
+    header = ctk.CTkFrame(parent, fg_color=ACCENT_COLOR, corner_radius=6)
+    for title, width, anchor, bold in columns:
+        label = ctk.CTkLabel(header, text=title, font=("Arial", 13, "bold"), text_color="white",
+                             **({"width": width} if width else {"anchor": 'w'}))
+        label.pack(side="left", padx=10, pady=3, **({} if width else {"fill": 'x', "expand": True}))
+    return header
+
+def build_table_row(parent, columns, bg_color):
+    frame = ctk.CTkFrame(parent, corner_radius=6, fg_color=bg_color)
+    labels = []
+    for title, width, anchor, bold in columns:
+        font = ("Arial", 14, "bold") if bold else ("Arial", 14)
+        if width:
+            label = ctk.CTkLabel(frame, text="", width=width, font=font, text_color=TEXT_COLOR, anchor=anchor)
+            label.pack(side="left", padx=10, pady=4)
+        else:
+            label = ctk.CTkLabel(frame, text="", font=font, text_color=TEXT_COLOR, anchor=anchor, justify='left')
+            label.pack(side="left", padx=10, pady=4, fill='x', expand=True)
+        labels.append(label)
+    return frame, labels
+
+def row_color(index):
+    return "white" if index % 2 == 0 else "#F0F0F0"
+
+# --- RowPool Class ---
+class RowPool:
+    # Table rows inside a scrollable frame that are created once and then only re-texted
+    def __init__(self, parent, columns):
+        self.parent = parent
+        self.columns = columns
+        self.rows = []
+        self.visible = 0
+        self.header = build_table_header(parent, columns)
+        self.status = ctk.CTkLabel(parent, text="", text_color=TEXT_COLOR)
+        self.status_text = None
+
+    def _create_row(self, index):
+        frame, labels = build_table_row(self.parent, self.columns, row_color(index))
+        return [frame, labels, [None] * len(labels)]
+
+    def show_status(self, text):
+        # Replaces the table with a single message ("Loading...", "not available")
+        if self.visible or self.header.winfo_manager():
+            self.header.pack_forget()
+            for frame, _, _ in self.rows[:self.visible]: frame.pack_forget()
+            self.visible = 0
+        if self.status_text != text: self.status.configure(text=text)
+        if self.status_text is None: self.status.pack(pady=20)
+        self.status_text = text
+
+    def hide_status(self):
+        if self.status_text is None: return
+        self.status.pack_forget()
+        self.status_text = None
+
+    def render(self, rows):
+        self.hide_status()
+        if not self.header.winfo_manager(): self.header.pack(fill="x", pady=(0, 5), padx=5)
+        while len(self.rows) < len(rows): self.rows.append(self._create_row(len(self.rows)))
+        for index, values in enumerate(rows):
+            frame, labels, shown = self.rows[index]
+            for col, value in enumerate(values):
+                if shown[col] != value:
+                    labels[col].configure(text=value)
+                    shown[col] = value
+            if index >= self.visible: frame.pack(fill="x", pady=2, padx=5)
+        for frame, _, _ in self.rows[len(rows):self.visible]: frame.pack_forget()
+        self.visible = len(rows)
+
+# --- VirtualTable Class ---
+class VirtualTable:
+    # Same interface as RowPool, but rows live in a VirtualList so thousands of rows cost
+    # no more widgets than fit on screen
+    def __init__(self, parent, columns, bg_color):
+        self.columns = columns
+        self.rows = []
+        self.row_state = {} # row frame -> [labels, shown texts, background color]
+        self.header = build_table_header(parent, columns)
+        self.status = ctk.CTkLabel(parent, text="", text_color=TEXT_COLOR)
+        self.status_text = None
+        self.list = VirtualList(parent, self._create_row, self._bind_row, bg_color=bg_color)
+        self._pack_table()
+
+    def _pack_table(self):
+        self.header.pack(fill="x", padx=15, pady=(10, 5))
+        self.list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def _create_row(self, parent):
+        frame, labels = build_table_row(parent, self.columns, row_color(0))
+        self.row_state[frame] = [labels, [None] * len(labels), row_color(0)]
+        return frame
+
+    def _bind_row(self, frame, index):
+        labels, shown, color = self.row_state[frame]
+        if color != row_color(index):
+            frame.configure(fg_color=row_color(index))
+            self.row_state[frame][2] = row_color(index)
+        for col, value in enumerate(self.rows[index]):
+            if shown[col] != value:
+                labels[col].configure(text=value)
+                shown[col] = value
+
+    def show_status(self, text):
+        if self.status_text is None:
+            self.header.pack_forget()
+            self.list.pack_forget()
+            self.status.pack(pady=20)
+        if self.status_text != text: self.status.configure(text=text)
+        self.status_text = text
+
+    def hide_status(self):
+        if self.status_text is None: return
+        self.status.pack_forget()
+        self.status_text = None
+        self._pack_table()
+
+    def render(self, rows):
+        self.rows = rows
+        self.hide_status()
+        self.list.set_items(len(rows))
+
+# --- ChatLog Class ---
+class ChatLog:
+    # Chat messages live in a capped ring buffer of plain records; only the bubbles that are
+    # on screen exist as widgets. Bubble heights are estimated from cached word widths so
+    # a resize only does arithmetic plus a re-bind of the visible bubbles.
+    def __init__(self, parent, limit=CHAT_HISTORY_LIMIT):
+        self.records = deque(maxlen=limit)
+        self.next_id = 0
+        self.scale = ctk.ScalingTracker.get_widget_scaling(parent)
+        self.font = tkfont.Font(family=CHAT_FONT[0], size=-round(CHAT_FONT[1] * self.scale))
+        self.space_width = self.font.measure(" ")
+        self.line_height = self.font.metrics("linespace")
+        self.width = 0
+        self.resize_job = None
+        self.scroll_job = None
+        self.bubble_state = {} # row frame -> [bubble, label, shown text, color, padx, wraplength]
+        self.list = VirtualList(parent, self._create_bubble, self._bind_bubble, bg_color=CHAT_HISTORY_BG)
+        self.list.canvas.bind("<Configure>", self._on_resize, add='+')
+
+    def grid(self, **kwargs): self.list.grid(**kwargs)
+
+    def add(self, text, is_user=False):
+        is_error = text.startswith("Bot: ❌ Error:")
+        record = {"id": self.next_id, "text": text, "is_user": is_user, "is_error": is_error,
+                  "words": self._measure_words(text)}
+        self.next_id += 1
+        self.records.append(record)
+        self._relayout()
+        self._schedule_scroll_to_end()
+        return record["id"]
+
+    def update(self, record_id, text):
+        # Replaces a message's text in place (used to fill in pending replies)
+        for index, record in enumerate(self.records):
+            if record["id"] == record_id:
+                record["text"] = text
+                record["is_error"] = text.startswith("Bot: ❌ Error:")
+                record["words"] = self._measure_words(text)
+                self._relayout(rebind=False)
+                self.list.rebind(index)
+                return True
+        return False
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def style(record):
+        if record["is_error"]: return ERROR_COLOR, (5, 5)
+        if record["is_user"]: return USER_MSG_BG, (5, 60)
+        return BOT_MSG_BG, (5, 5)
+
+    def wraplength(self, padx):
+        width = self.width / self.scale if self.width > 1 else 520
+        return max(100, int(width - padx[0] - padx[1] - 20))
+
+    def _measure_words(self, text):
+        return [[self.font.measure(word) for word in line.split(" ")] for line in text.split("\n")]
+
+    def _line_count(self, words, wrap_px):
+        lines = 0
+        for paragraph in words:
+            lines += 1
+            line = None
+            for width in paragraph:
+                if line is None: line = width
+                elif line + self.space_width + width <= wrap_px: line += self.space_width + width
+                else:
+                    lines += 1
+                    line = width
+                if line > wrap_px:
+                    lines += math.ceil(line / wrap_px) - 1
+                    line = line % wrap_px
+        return lines
+
+    def _height(self, record):
+        _, padx = self.style(record)
+        lines = self._line_count(record["words"], self.wraplength(padx) * self.scale)
+        text_height = max(28 * self.scale, lines * self.line_height + 4 * self.scale)
+        # label pady 6+6, bubble pady 2+5, plus a little slack for font rounding
+        return int(text_height + 19 * self.scale + 4) + VIRTUAL_ROW_GAP
+
+    def _relayout(self, rebind=True):
+        self.list.set_items(len(self.records), [self._height(r) for r in self.records], rebind=rebind)
+
+    def _create_bubble(self, parent):
+        row = ctk.CTkFrame(parent, fg_color=CHAT_HISTORY_BG, corner_radius=0)
+        bubble = ctk.CTkFrame(row, fg_color=BOT_MSG_BG, corner_radius=12)
+        bubble.pack(fill="x", pady=(2, 5), padx=(5, 5), anchor="w")
+        label = ctk.CTkLabel(bubble, text="", wraplength=500, justify="left", font=CHAT_FONT, text_color=TEXT_COLOR, anchor="w")
+        label.pack(padx=10, pady=6, fill="x", expand=True)
+        self.bubble_state[row] = [bubble, label, None, BOT_MSG_BG, (5, 5), 500]
+        return row
+
+    def _bind_bubble(self, row, index):
+        record = self.records[index]
+        state = self.bubble_state[row]
+        bubble, label = state[0], state[1]
+        color, padx = self.style(record)
+        wrap = self.wraplength(padx)
+        if state[3] != color:
+            bubble.configure(fg_color=color)
+            state[3] = color
+        if state[4] != padx:
+            bubble.pack_configure(padx=padx)
+            state[4] = padx
+        if state[5] != wrap:
+            label.configure(wraplength=wrap)
+            state[5] = wrap
+        if state[2] != record["text"]:
+            label.configure(text=record["text"])
+            state[2] = record["text"]
+
+    def _on_resize(self, event):
+        if event.width == self.width: return
+        self.width = event.width
+        if self.resize_job: self.list.canvas.after_cancel(self.resize_job)
+        self.resize_job = self.list.canvas.after(CHAT_RESIZE_DEBOUNCE_MS, self._apply_resize)
+
+    def _apply_resize(self):
+        self.resize_job = None
+        at_end = self.list.canvas.yview()[1] >= 0.999
+        self._relayout(rebind=False)
+        for index in self.list.visible_range(): self.list.rebind(index)
+        if at_end: self.list.scroll_to_end()
+
+    def _schedule_scroll_to_end(self):
+        if self.scroll_job: return
+        def _scroll():
+            self.scroll_job = None
+            self.list.scroll_to_end()
+        self.scroll_job = self.list.canvas.after_idle(_scroll)
+
+# --- VirtualList Class ---
+class VirtualList:
+    # Scrollable list that only keeps widgets for the visible rows plus an overscan margin.
+    # create_row(parent) builds one reusable row widget; bind_row(row, index) fills it for an item.
+    def __init__(self, parent, create_row, bind_row, bg_color, overscan=VIRTUAL_OVERSCAN):
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.overscan = overscan
+        self.frame = ctk.CTkFrame(parent, fg_color=bg_color)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.canvas = ctk.CTkCanvas(self.frame, highlightthickness=0, bg=bg_color, yscrollincrement=VIRTUAL_SCROLL_STEP)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel, add='+')
+        self.canvas.bind_all("<Button-4>", self._on_mousewheel, add='+')
+        self.canvas.bind_all("<Button-5>", self._on_mousewheel, add='+')
+        self.count = 0
+        self.heights = None # None -> every row has the measured height of a live row
+        self.row_height = None
+        self.offsets = [0]
+        self.slots = [] # [row, window_id, bound_index]
+        self.bound = {} # item index -> slot
+
+    def pack(self, **kwargs): self.frame.pack(**kwargs)
+    def pack_forget(self): self.frame.pack_forget()
+    def grid(self, **kwargs): self.frame.grid(**kwargs)
+    def winfo_manager(self): return self.frame.winfo_manager()
+
+    def set_items(self, count, heights=None, rebind=True):
+        self.count = count
+        self.heights = heights
+        if count and heights is None and self.row_height is None: self._measure_row_height()
+        self._rebuild_offsets()
+        if rebind:
+            for slot in self.slots: slot[2] = None
+            self.bound.clear()
+        self.refresh()
+
+    def item_height(self, index):
+        return self.heights[index] if self.heights is not None else self.row_height
+
+    def _measure_row_height(self):
+        slot = self._new_slot()
+        row = slot[0]
+        row.update_idletasks()
+        self.row_height = max(1, row.winfo_reqheight()) + VIRTUAL_ROW_GAP
+
+    def _rebuild_offsets(self):
+        offsets = [0] * (self.count + 1)
+        total = 0
+        for i in range(self.count):
+            offsets[i] = total
+            total += self.item_height(i)
+        offsets[self.count] = total
+        self.offsets = offsets
+        self.canvas.configure(scrollregion=(0, 0, 0, total))
+
+    def _new_slot(self):
+        row = self.create_row(self.canvas)
+        window_id = self.canvas.create_window(0, 0, window=row, anchor="nw", state="hidden",
+                                              width=max(1, self.canvas.winfo_width()))
+        slot = [row, window_id, None]
+        self.slots.append(slot)
+        return slot
+
+    def visible_range(self):
+        if not self.count: return range(0)
+        top = self.canvas.canvasy(0)
+        bottom = top + max(1, self.canvas.winfo_height())
+        first = max(0, bisect.bisect_right(self.offsets, top) - 1 - self.overscan)
+        last = min(self.count, bisect.bisect_left(self.offsets, bottom) + self.overscan)
+        return range(first, last)
+
+    def refresh(self):
+        wanted = self.visible_range()
+        # Release slots whose item scrolled out of the window, then bind the newly visible items
+        free = []
+        for slot in self.slots:
+            if slot[2] is None or slot[2] not in wanted:
+                if slot[2] is not None: self.bound.pop(slot[2], None)
+                slot[2] = None
+                free.append(slot)
+        for index in wanted:
+            slot = self.bound.get(index)
+            if slot is None:
+                slot = free.pop() if free else self._new_slot()
+                slot[2] = index
+                self.bound[index] = slot
+                self.bind_row(slot[0], index)
+            self.canvas.coords(slot[1], 0, self.offsets[index])
+            self.canvas.itemconfigure(slot[1], height=self.item_height(index) - VIRTUAL_ROW_GAP, state="normal")
+        for slot in free: self.canvas.itemconfigure(slot[1], state="hidden")
+
+    def rebind(self, index):
+        # Re-fill one item in place if it is currently on screen
+        slot = self.bound.get(index)
+        if slot is not None: self.bind_row(slot[0], index)
+
+    def scroll_to_end(self):
+        self.canvas.yview_moveto(1.0)
+        self.refresh()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def _on_canvas_configure(self, event):
+        for slot in self.slots: self.canvas.itemconfigure(slot[1], width=event.width)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        if not self.frame.winfo_ismapped() or not str(event.widget).startswith(str(self.canvas)): return
+        if getattr(event, "num", None) == 4: step = -1
+        elif getattr(event, "num", None) == 5: step = 1
+        elif sys.platform == "darwin": step = -event.delta
+        else: step = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.canvas.yview_scroll(step * VIRTUAL_WHEEL_UNITS, "units")
+        self.refresh()
+
+# --- ViewModel Class ---
+class ViewModel:
+    # Formatted text per label: only values that differ from what is on screen
+    # reach Tk, and all of them go out in one flush per frame
+    def __init__(self, root):
+        self.root = root
+        self._shown = {}
+        self._pending = {}
+        self._flush_scheduled = False
+        self.applied = 0
+        self.skipped = 0
+
+    def set(self, widget, text):
+        if self._shown.get(widget) == text:
+            # Also cancels an unflushed placeholder, e.g. clear_ui_data followed by the same value
+            if self._pending.pop(widget, None) is None: self.skipped += 1
+            return
+        self._pending[widget] = text
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after_idle(self.flush)
+
+    def flush(self):
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        for widget, text in pending.items():
+            try: widget.configure(text=text)
+            except Exception as e:
+                print(f"View update error: {e}")
+                continue
+            self._shown[widget] = text
+            self.applied += 1
+
+# --- WeatherApp Class ---
 class WeatherApp:
     def __init__(self):
         self.app = None
@@ -140,28 +729,52 @@ class WeatherApp:
         self.bg_label = None
         self.bg_image_tk = None
         self.original_bg = None
+        self.bg_pyramid = []
+        self.bg_cache = OrderedDict()
+        self.bg_size = None
+        self.bg_settle_job = None
+        self.bg_draft_busy = False
         self.current_data = None
         self.forecast_data = None
         self.astro_data = None
         self.ui_elements = {
-            "current": {}, "hourly": [], "daily": [], "astro": {}, "chat": []
+            "current": {}, "hourly": None, "daily": None, "astro": {}, "chat": None
         }
+        self.client = None
+        self.executor = None
+        self.ui_queue = queue.Queue()
+        self.restored_city = None
+        self.search_generation = 0 # Bumped by every search; only the newest one may render
+        self.loading_tabs = set() # Tabs still showing a loading placeholder for the active search
+        self.active_search = None
+        self.metrics = {}
+        self.icons = IconRegistry(ICON_PATHS)
+        self.shown_icon = None
+        self.view = None
         self.initialize_app()
 
     def initialize_app(self):
         try:
             self.verify_api_key()
+            self.client = get_client(API_KEY)
             self.verify_resources()
-            self.check_connection()
 
             self.app = ctk.CTk()
             self.app.title("WeatherWise")
             self.app.geometry("1200x800")
             self.app.minsize(1000, 700)
+            self.app.protocol("WM_DELETE_WINDOW", self.on_close)
+            self.view = ViewModel(self.app)
+            self.executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="weather-fetch")
+            self.executor.submit(self.icons.preload, ('sun', 'moon'))
+            self.app.after(UI_POLL_MS, self._drain_ui_queue)
             self.chatbot = WeatherChatBot(self)
             self.setup_background()
             self.setup_main_ui()
+            self.restore_last_search()
             self.update_time()
+            # The connection check runs only once the window is on screen
+            self.app.bind("<Map>", self._on_first_map, add='+')
             self.app.mainloop()
 
         except FileNotFoundError as e:
@@ -180,14 +793,6 @@ class WeatherApp:
                   tkinter.messagebox.showerror("Initialization Error", f"Failed to start: Configuration Error\n\n{e}")
              except ImportError: pass
              sys.exit(1)
-        except requests.exceptions.ConnectionError as e:
-             print(f"Initialization failed: Network error.")
-             print(f"Details: {e}")
-             try:
-                  import tkinter.messagebox
-                  tkinter.messagebox.showerror("Initialization Error", f"Failed to start: Network Error\n\n{e}\n\nPlease check your internet connection.")
-             except ImportError: pass
-             sys.exit(1)
         except Exception as e:
             # Catch other errors like the invalid color name
             print(f"An unexpected error occurred during initialization: {str(e)}")
@@ -201,6 +806,55 @@ class WeatherApp:
                  except: pass
             sys.exit(1)
 
+    def on_close(self):
+        if self.executor:
+            # Queued fetches are dropped; the interpreter joins running workers at exit, so the
+            # client below also wakes any that wait for a token or a retry
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        if self.view:
+            print(f"View: {self.view.applied} label updates applied, {self.view.skipped} unchanged skipped")
+        if self.client:
+            stats = self.client.stats
+            print(f"Client: {stats['requests']} requests, {stats['coalesced']} coalesced, {stats['stale_served']} served stale, "
+                  f"{stats['throttled']} throttled, {stats['retries']} retried")
+            if stats["requests"] > 1:
+                # The first request pays the TCP/TLS handshake; later ones reuse the kept-alive connection
+                later_ms = (stats["total_ms"] - stats["first_ms"]) / (stats["requests"] - 1)
+                print(f"Latency: first request {stats['first_ms']:.0f} ms, later requests {later_ms:.0f} ms on average, "
+                      f"last {stats['last_ms']:.0f} ms")
+            print(f"Quota: {self.client.quota.calls} of {self.client.quota.monthly_limit} calls used this month")
+            self.client.close()
+        if self.app:
+            self.app.destroy()
+            self.app = None
+
+    # --- Background work: workers never touch Tk, they post callbacks to ui_queue ---
+    def run_in_background(self, func, on_success, on_error=None):
+        future = self.executor.submit(func)
+        def _done(f):
+            if f.cancelled(): return
+            try: result = f.result()
+            except Exception as e:
+                if on_error: self.post_to_ui(on_error, e)
+                else: print(f"Background task error: {e}")
+                return
+            self.post_to_ui(on_success, result)
+        future.add_done_callback(_done)
+        return future
+
+    def post_to_ui(self, callback, *args):
+        self.ui_queue.put((callback, args))
+
+    def _drain_ui_queue(self):
+        if not self.app: return
+        while True:
+            try: callback, args = self.ui_queue.get_nowait()
+            except queue.Empty: break
+            try: callback(*args)
+            except Exception as e: print(f"UI callback error: {e}")
+        self.app.after(UI_POLL_MS, self._drain_ui_queue)
+
     def verify_api_key(self):
          if not API_KEY or not re.match(r"^[a-zA-Z0-9]{30}$", API_KEY):
               raise ValueError("Invalid or missing API Key format in configuration.")
@@ -214,42 +868,158 @@ class WeatherApp:
         if missing_files:
             raise FileNotFoundError(f"Missing required file(s) at specified path(s): {', '.join(missing_files)}")
 
-    def check_connection(self):
+    def check_connection(self, query=DEFAULT_PROBE_CITY, endpoint="current"):
+        # Runs on a worker thread; the response is cached so it doubles as warm data
         try:
-            test_url = f"http://api.weatherapi.com/v1/current.json?key={API_KEY}&q=London"
-            response = requests.get(test_url, timeout=10)
-            if response.status_code == 401 or response.status_code == 403:
-                 raise ValueError("Invalid API key or permission issue.")
-            response.raise_for_status()
-        except requests.exceptions.Timeout:
-            raise requests.exceptions.ConnectionError("Connection timed out.")
-        except requests.exceptions.ConnectionError:
-             raise requests.exceptions.ConnectionError("Network error.")
+            return self.client.refresh(endpoint, query, timeout=CONNECTION_CHECK_TIMEOUT)
         except requests.exceptions.HTTPError as e:
-             print(f"Warning: API check status {response.status_code}.")
+            # A throttled or over-quota key answers 429/403 too; only the error code tells them apart
+            if is_quota_error(e.response):
+                print(f"Warning: API quota or rate limit reached (status {e.response.status_code}).")
+                return None
+            if e.response.status_code in (401, 403) or api_error_code(e.response) in KEY_ERROR_CODES:
+                 raise ValueError("Invalid API key or permission issue.")
+            print(f"Warning: API check status {e.response.status_code}.")
+            return None
+
+    def _on_first_map(self, event=None):
+        if event is not None and event.widget is not self.app: return
+        if "first_paint_ms" in self.metrics: return
+        self.app.after_idle(self._record_first_paint)
+
+    def _record_first_paint(self):
+        self.metrics["first_paint_ms"] = (time.perf_counter() - STARTUP_T0) * 1000
+        print(f"Startup: first paint after {self.metrics['first_paint_ms']:.0f} ms")
+        self.start_connection_check()
+
+    def start_connection_check(self):
+        # Refreshing the restored city validates the key and updates the screen in one request;
+        # with nothing restored a probe city is fetched instead and lands in the cache.
+        endpoints = search_endpoints()
+        query = self.restored_city or DEFAULT_PROBE_CITY
+        probe_endpoint = endpoints[0]
+        started = time.perf_counter()
+        self.run_in_background(
+            lambda: self.check_connection(query, probe_endpoint),
+            on_success=lambda entry: self._on_connection_ok(query, probe_endpoint, entry, started),
+            on_error=self._on_connection_error
+        )
+
+    def _on_connection_ok(self, query, endpoint, entry, started):
+        self.metrics["connection_check_ms"] = (time.perf_counter() - started) * 1000
+        print(f"Startup: connection check finished in {self.metrics['connection_check_ms']:.0f} ms")
+        if not self.restored_city: return
+        if entry is not None: self._on_revalidated(query, endpoint, entry)
+        others = tuple(ep for ep in search_endpoints() if ep != endpoint)
+        if others: self._refresh_in_background(query, others)
+
+    def _on_connection_error(self, e):
+        if isinstance(e, ValueError):
+            self.show_error(f"{e} Please check the API key in config.py.")
+        elif isinstance(e, RateLimitedError):
+            print(f"Connection check skipped: {e}")
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            self.show_error(f"Network Error: Check connection. Cached data will be shown where available. ({e})")
+        else:
+            self.show_error(f"Connection check failed: {e}")
 
     def setup_background(self):
         try:
-            self.original_bg = Image.open(BG_IMAGE_PATH)
+            if not os.path.exists(BG_IMAGE_PATH): raise FileNotFoundError(BG_IMAGE_PATH)
             self.bg_label = ctk.CTkLabel(self.app, text="")
             self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-            self.app.after(100, self.update_background)
+            # Decoding the PNG and building the pyramid happens off the UI thread
+            self.run_in_background(self._load_background, on_success=self._on_background_loaded,
+                                   on_error=lambda e: print(f"Error loading background image: {str(e)}"))
             self.app.bind("<Configure>", self.update_background, add='+')
         except Exception as e:
             print(f"Error loading background image: {str(e)}")
             self.app.configure(fg_color=MAIN_BG)
 
+    def _load_background(self):
+        original = Image.open(BG_IMAGE_PATH)
+        original.load()
+        # Mip pyramid: halved copies so drafts are resized from the nearest larger level
+        pyramid = [original]
+        while min(pyramid[-1].size) // 2 >= BG_MIP_MIN_SIDE:
+            pyramid.append(pyramid[-1].reduce(2))
+        return original, pyramid
+
+    def _on_background_loaded(self, result):
+        self.original_bg, self.bg_pyramid = result
+        self.bg_size = None
+        self.update_background()
+
     def update_background(self, event=None):
+        # Only the toplevel's own size changes matter; child widgets fire <Configure> too
+        if event is not None and event.widget is not self.app: return
         if not self.original_bg or not self.bg_label: return
+        width, height = self.app.winfo_width(), self.app.winfo_height()
+        if width <= 1 or height <= 1 or (width, height) == self.bg_size: return
+        self.bg_size = (width, height)
+        if self.bg_size in self.bg_cache:
+            self.bg_cache.move_to_end(self.bg_size)
+            self._apply_background(self.bg_cache[self.bg_size])
+            return
+        self._request_draft_background()
+        if self.bg_settle_job: self.app.after_cancel(self.bg_settle_job)
+        self.bg_settle_job = self.app.after(BG_SETTLE_MS, self._settle_background)
+
+    def _request_draft_background(self):
+        # At most one draft in flight; when it lands it catches up with the latest size
+        if self.bg_draft_busy: return
+        self.bg_draft_busy = True
+        size = self.bg_size
+        self.run_in_background(lambda: self._scale_background(size, Image.Resampling.BILINEAR),
+                               on_success=lambda img: self._on_draft_background(size, img),
+                               on_error=lambda e: self._on_draft_background(size, None))
+
+    def _on_draft_background(self, size, image):
+        self.bg_draft_busy = False
+        if image is not None and size == self.bg_size and size not in self.bg_cache:
+            self._apply_background(self._background_image(size, image))
+        if size != self.bg_size and self.bg_size not in self.bg_cache:
+            self._request_draft_background()
+
+    def _settle_background(self):
+        self.bg_settle_job = None
+        size = self.bg_size
+        if size is None or size in self.bg_cache: return
+        self.run_in_background(lambda: self._scale_background(size, Image.Resampling.LANCZOS),
+                               on_success=lambda img: self._on_settled_background(size, img),
+                               on_error=lambda e: print(f"Error scaling background image: {str(e)}"))
+
+    def _on_settled_background(self, size, image):
+        image = self._background_image(size, image)
+        if image is None: return
+        self.bg_cache[size] = image
+        self.bg_cache.move_to_end(size)
+        while len(self.bg_cache) > BG_SCALE_CACHE_SIZE: self.bg_cache.popitem(last=False)
+        if size == self.bg_size: self._apply_background(image)
+
+    def _scale_background(self, size, resample):
+        # Runs on a worker thread
+        source = self.bg_pyramid[0]
+        for level in self.bg_pyramid:
+            if level.size[0] >= size[0] and level.size[1] >= size[1]: source = level
+        return source.resize(size, resample)
+
+    def _background_image(self, size, image):
+        # size is in physical pixels (winfo_*) and the image is already that big; CTkImage wants
+        # logical units and multiplies by the scaling, so it only has to copy, not resample
+        scale = ctk.ScalingTracker.get_widget_scaling(self.bg_label)
+        try: return ctk.CTkImage(light_image=image, size=(size[0] / scale, size[1] / scale))
+        except Exception as e:
+            print(f"Error creating background image: {str(e)}")
+            return None
+
+    def _apply_background(self, image):
+        if image is None: return
         try:
-            width = self.app.winfo_width()
-            height = self.app.winfo_height()
-            if width == 0 or height == 0: return
-            resized_image = self.original_bg.resize((width, height), Image.Resampling.LANCZOS)
-            self.bg_image_tk = ctk.CTkImage(light_image=resized_image, size=(width, height))
+            self.bg_image_tk = image
             self.bg_label.configure(image=self.bg_image_tk)
             self.bg_label.lower()
-        except Exception as e: pass
+        except Exception as e: print(f"Error applying background image: {str(e)}")
 
     def setup_main_ui(self):
         self.main_frame = ctk.CTkFrame(
@@ -329,15 +1099,21 @@ class WeatherApp:
         self.ui_elements["current"]["pressure"].grid(row=1, column=0, padx=10, pady=8, sticky='e')
         self.ui_elements["current"]["visibility"] = ctk.CTkLabel(metrics_frame, text="👁️ Visibility: -- km", font=("Arial", 16), text_color=TEXT_COLOR)
         self.ui_elements["current"]["visibility"].grid(row=1, column=1, padx=10, pady=8, sticky='w')
-        self.load_weather_icon(ICON_PATHS.get('sun'), size=(120, 120))
+        self.load_weather_icon('sun', size=(120, 120))
 
     def setup_hourly_tab(self, parent):
-        self.hourly_scroll = ctk.CTkScrollableFrame(parent, fg_color="transparent")
-        self.hourly_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        # The full 7-day hourly forecast (168 rows) is rendered through a virtualized table
+        self.ui_elements["hourly"] = VirtualTable(parent, [
+            ("Time", 100, 'w', False), ("Temp", 60, 'w', True), ("Condition", None, 'w', False), ("Wind (km/h)", 100, 'center', False)
+        ], bg_color=MAIN_BG)
 
     def setup_daily_tab(self, parent):
         self.daily_scroll = ctk.CTkScrollableFrame(parent, fg_color="transparent")
         self.daily_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        columns = [("Date", 120, 'w', False), ("Temp (°C)", 120, 'w', True), ("Condition", None, 'w', False), ("Rain (%)", 80, 'center', False)]
+        if weather_analytics is not None:
+            columns[3:] = [("Feels (°C)", 110, 'w', False), ("Rain", 110, 'center', False)]
+        self.ui_elements["daily"] = RowPool(self.daily_scroll, columns)
 
     def setup_astro_tab(self, parent):
         parent.grid_columnconfigure(0, weight=1)
@@ -360,10 +1136,8 @@ class WeatherApp:
     def setup_chat_tab(self, parent):
         parent.grid_rowconfigure(0, weight=1)
         parent.grid_columnconfigure(0, weight=1)
-        self.chat_history = ctk.CTkScrollableFrame(parent,
-                                                fg_color=CHAT_HISTORY_BG # USE SOLID COLOR
-                                                )
-        self.chat_history.grid(row=0, column=0, sticky="nsew", padx=15, pady=10)
+        self.ui_elements["chat"] = ChatLog(parent)
+        self.ui_elements["chat"].grid(row=0, column=0, sticky="nsew", padx=15, pady=10)
         input_frame = ctk.CTkFrame(parent, fg_color="transparent")
         input_frame.grid(row=1, column=0, sticky="ew", padx=15, pady=(0, 10))
         input_frame.grid_columnconfigure(0, weight=1)
@@ -381,241 +1155,337 @@ class WeatherApp:
         self._add_chat_message("Bot: Hello! Ask me about the weather...", is_user=False)
 
     def update_time(self):
-        now = datetime.now().strftime("%H:%M:%S")
-        self.time_label.configure(text=now)
-        self.app.after(1000, self.update_time)
+        now = datetime.now()
+        self.view.set(self.time_label, now.strftime("%H:%M:%S"))
+        # Tick just after each wall-clock second so no second is skipped or shown twice
+        self.app.after(1000 - now.microsecond // 1000 + 5, self.update_time)
 
     def update_weather_wrapper(self, event=None):
-        self.show_loading(True)
-        self.app.after(50, self.update_weather)
-
-    def update_weather(self):
         city = self.location_entry.get().strip()
         if not city:
             self.show_error("Please enter a city name.")
-            self.show_loading(False)
             return
+        self.show_loading(True)
+        self.update_weather(city)
+
+    def update_weather(self, city):
+        # All endpoints are requested at once; each tab renders as soon as its own data lands
+        search = self._new_search(city)
+        for endpoint in search["endpoints"]:
+            search["futures"].append(self.run_in_background(
+                lambda ep=endpoint: self._fetch_for_search(search, ep),
+                on_success=lambda entry, ep=endpoint: self._on_endpoint_data(search, ep, entry),
+                on_error=lambda e, ep=endpoint: self._on_endpoint_error(search, ep, e)
+            ))
+
+    def _new_search(self, city):
+        # A newer search supersedes the old one: queued fetches are cancelled, running ones are discarded on arrival
+        superseded = self.active_search
+        if superseded is not None:
+            for future in superseded["futures"]: future.cancel()
+            if superseded["pending"]: print(f"Search for '{superseded['city']}' superseded by '{city}'")
+        self.search_generation += 1
+        endpoints = search_endpoints()
+        self.active_search = {"city": city, "endpoints": endpoints, "pending": set(endpoints), "errors": {},
+                              "rendered": False, "stale_age": None, "restored": False,
+                              "generation": self.search_generation, "futures": [],
+                              "started": time.perf_counter(), "first_pixel_ms": None}
+        return self.active_search
+
+    def _is_current(self, search):
+        return search["generation"] == self.search_generation
+
+    def _fetch_for_search(self, search, endpoint):
+        # Runs on a worker; a search superseded while queued skips the network entirely
+        if not self._is_current(search): return None
+        city = search["city"]
+        return self.fetch_weather_entry(
+            city, endpoint, on_update=lambda entry: self.post_to_ui(self._on_revalidated, city, endpoint, entry))
+
+    def restore_last_search(self):
+        # Warm start: paint the last searched city straight from the disk cache; the startup
+        # connection check then refreshes it
+        recent = self.client.cache.recent_searches(1)
+        if not recent: return
+        city = recent[0]
+        search = self._new_search(city)
+        search["restored"] = True
+        entries = {ep: self.client.cache.get_stale(city, ep) for ep in search["endpoints"]}
+        if not all(entries.values()): return
+        self.location_entry.insert(0, city)
+        self.restored_city = city
+        for endpoint, entry in entries.items():
+            self._on_endpoint_data(search, endpoint, entry)
+
+    def _refresh_in_background(self, city, endpoints):
+        # Quietly re-renders the shown city once fresh data arrives; no loading state or chat noise
+        for endpoint in endpoints:
+            on_update = lambda entry, ep=endpoint: self.post_to_ui(self._on_revalidated, city, ep, entry)
+            self.run_in_background(
+                lambda ep=endpoint, cb=on_update: self.fetch_weather_entry(city, ep, on_update=cb, background=True),
+                on_success=lambda entry, ep=endpoint: entry.is_fresh() and self._on_revalidated(city, ep, entry)
+            )
+
+    def _on_endpoint_data(self, search, endpoint, entry):
+        if not self._is_current(search): return
+        if not entry.is_fresh():
+            search["stale_age"] = max(search["stale_age"] or 0, entry.age())
         try:
-            self.current_data = self.fetch_weather_data(city, "current")
-            self.forecast_data = self.fetch_weather_data(city, "forecast")
-            self.astro_data = self.fetch_weather_data(city, "astronomy")
-            self.last_city = city.capitalize()
-            self.clear_ui_data()
-            self.update_current_tab()
-            self.update_hourly_tab()
-            self.update_daily_tab()
-            self.update_astro_tab()
-            self._add_chat_message(f"Bot: Showing weather information for {self.last_city}.", is_user=False)
-        except requests.exceptions.HTTPError as e:
-             if e.response.status_code == 400: self.show_error(f"City not found: '{city}'. Check spelling.")
-             else: self.show_error(f"API Error: {e.response.status_code}. Could not fetch data.")
-        except requests.exceptions.ConnectionError as e: self.show_error(f"Network Error: Check connection. ({e})")
+            if not search["rendered"]:
+                # First successful response replaces whatever the previous city left on screen
+                search["rendered"] = True
+                self.current_data = self.forecast_data = self.astro_data = None
+                self.last_city = search["city"].capitalize()
+                self.clear_ui_data()
+            stages = self._render_stages(endpoint, entry.data)
         except Exception as e:
-            self.show_error(f"Failed to update weather: {str(e)}")
+            search["errors"][endpoint] = e
             print(f"Detailed error: {e}")
-        finally: self.show_loading(False)
-
-    def fetch_weather_data(self, city, endpoint):
-        base_url = "http://api.weatherapi.com/v1/"
-        endpoints = {
-            "current": f"current.json?key={API_KEY}&q={city}",
-            "forecast": f"forecast.json?key={API_KEY}&q={city}&days=7",
-            "astronomy": f"astronomy.json?key={API_KEY}&q={city}"
-        }
-        if endpoint not in endpoints: raise ValueError(f"Invalid API endpoint: {endpoint}")
-        try:
-            response = requests.get(base_url + endpoints[endpoint], timeout=15)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.Timeout: raise requests.exceptions.ConnectionError(f"API request timed out.")
-        except requests.exceptions.RequestException as e:
-            if isinstance(e, requests.exceptions.ConnectionError): raise requests.exceptions.ConnectionError(f"Network error: {e}")
-            raise e
-
-    def load_weather_icon(self, icon_path, size=(100, 100)):
+            stages = []
+        self._run_stages(search, endpoint, stages)
+
+    def _render_stages(self, endpoint, data):
+        # Current conditions first, then hourly, daily and astro
+        if endpoint == "current":
+            self.current_data = data
+            if "astronomy" in search_endpoints(): return [self.update_current_tab]
+            # No astronomy.json request: the astro tab is computed from this report's location
+            self.astro_data = data
+            return [self.update_current_tab, self.update_astro_tab]
+        if endpoint == "astronomy":
+            self.astro_data = data
+            return [self.update_astro_tab]
+        self.forecast_data = data
+        if not SINGLE_REQUEST_MODE: return [self.update_hourly_tab, self.update_daily_tab]
+        # The forecast report carries the current and astro records too
+        self.current_data = self.astro_data = data
+        return [self.update_current_tab, self.update_hourly_tab, self.update_daily_tab, self.update_astro_tab]
+
+    def _run_stages(self, search, endpoint, stages):
+        # One tab per event-loop turn, each painted before the next one is built
+        if not self._is_current(search): return
+        if not stages:
+            self._finish_endpoint(search, endpoint)
+            return
+        stage = stages[0]
+        try: stage()
+        except Exception as e:
+            search["errors"][endpoint] = e
+            print(f"Detailed error: {e}")
+        # The label flush and the redraws it triggers are idle callbacks too; run them now, or
+        # they would share an idle pass with (and land after) the next stage
+        self.view.flush()
+        self.app.update_idletasks()
+        if stage == self.update_current_tab and search["first_pixel_ms"] is None:
+            self._record_first_pixel(search)
+        self.app.after(1, self._run_stages, search, endpoint, stages[1:])
+
+    def _record_first_pixel(self, search):
+        if search["first_pixel_ms"] is not None: return
+        search["first_pixel_ms"] = self.metrics["first_pixel_ms"] = (time.perf_counter() - search["started"]) * 1000
+
+    def _render_endpoint(self, endpoint, data):
+        for stage in self._render_stages(endpoint, data): stage()
+
+    def _on_revalidated(self, city, endpoint, entry):
+        # A stale payload was shown while the client refreshed it; swap in the fresh one
+        shown = self.active_search["city"] if self.active_search else self.last_city
+        if not shown or normalize_location(city) != normalize_location(shown): return
+        try: self._render_endpoint(endpoint, entry.data)
+        except Exception as e: print(f"Detailed error: {e}")
+
+    def _on_endpoint_error(self, search, endpoint, e):
+        if not self._is_current(search): return
+        search["errors"][endpoint] = e
+        print(f"Fetch error for {search['city']} ({endpoint}): {e}")
+        self._finish_endpoint(search, endpoint)
+
+    def _finish_endpoint(self, search, endpoint):
+        search["pending"].discard(endpoint)
+        if search["pending"]: return
+        self.metrics["search_total_ms"] = (time.perf_counter() - search["started"]) * 1000
+        self.show_loading(False)
+        if search["first_pixel_ms"] is not None:
+            print(f"Search: first useful pixel after {search['first_pixel_ms']:.0f} ms, complete after {self.metrics['search_total_ms']:.0f} ms")
+        if "render_hourly_ms" in self.metrics and "render_daily_ms" in self.metrics:
+            print(f"Render: hourly {self.metrics['render_hourly_ms']:.1f} ms, daily {self.metrics['render_daily_ms']:.1f} ms")
+        errors = search["errors"]
+        if len(errors) == len(search["endpoints"]):
+            self.show_error(self._describe_fetch_error(search["city"], errors[search["endpoints"][0]]))
+            return
+        if errors:
+            self.show_error(f"Some data could not be loaded for {self.last_city}: {', '.join(sorted(errors))}.")
+        if not search["restored"]:
+            self.executor.submit(self.client.cache.remember_search, search["city"])
+        if search["stale_age"] is not None:
+            self._add_chat_message(f"Bot: Showing cached weather for {self.last_city} from {format_age(search['stale_age'])} ago.", is_user=False)
+        else:
+            self._add_chat_message(f"Bot: Showing weather information for {self.last_city}.", is_user=False)
+
+    def _describe_fetch_error(self, city, e):
+        if isinstance(e, requests.exceptions.HTTPError):
+             if e.response.status_code == 400: return f"City not found: '{city}'. Check spelling."
+             if is_quota_error(e.response): return "API limit reached. Showing cached data where available; try again later."
+             return f"API Error: {e.response.status_code}. Could not fetch data."
+        # RateLimitedError is a ConnectionError subclass, but nothing was sent
+        if isinstance(e, RateLimitedError): return "Too many requests, retrying shortly. Showing cached data where available."
+        if isinstance(e, requests.exceptions.ConnectionError): return f"Network Error: Check connection. ({e})"
+        return f"Failed to update weather: {str(e)}"
+
+    def fetch_weather_data(self, city, endpoint, timeout=None):
+        return self.fetch_weather_entry(city, endpoint, timeout).data
+
+    def fetch_weather_entry(self, city, endpoint, timeout=None, on_update=None, background=False):
+        # Serves the last cached payload (entry.is_fresh() == False) while offline or revalidating
+        if timeout is None: timeout = ENDPOINT_TIMEOUTS.get(endpoint, 15)
+        return self.client.fetch_entry(endpoint, city, timeout=timeout, on_update=on_update, background=background)
+
+    def load_weather_icon(self, icon_name, size=(100, 100)):
+        if self.shown_icon == (icon_name, tuple(size)): return
         try:
-             if not icon_path or not os.path.exists(icon_path):
-                  # If placeholder path is defined, use it, otherwise show '?'
-                  placeholder_path = ICON_PATHS.get('placeholder')
-                  if placeholder_path and os.path.exists(placeholder_path):
-                        print(f"Warning: Icon '{icon_path}' not found. Using placeholder.")
-                        img = Image.open(placeholder_path)
-                  else:
-                        print(f"Error: Icon path not found or invalid: {icon_path}. Placeholder missing or undefined.")
+             ctk_img = self.icons.get(icon_name, size)
+             if ctk_img is None:
+                  # If placeholder icon is defined, use it, otherwise show '?'
+                  ctk_img = self.icons.get('placeholder', size)
+                  if ctk_img is None:
+                        print(f"Error: Icon not found or invalid: {icon_name}. Placeholder missing or undefined.")
                         self.ui_elements["current"]["icon"].configure(image=None, text="?")
+                        self.shown_icon = None
                         return
-             else:
-                  img = Image.open(icon_path)
-
-             ctk_img = ctk.CTkImage(light_image=img, size=size)
+                  print(f"Warning: Icon '{icon_name}' not found. Using placeholder.")
              self.ui_elements["current"]["icon"].configure(image=ctk_img, text="")
+             self.shown_icon = (icon_name, tuple(size))
         except Exception as e:
-             print(f"Error loading icon '{icon_path}': {e}")
+             print(f"Error loading icon '{icon_name}': {e}")
              self.ui_elements["current"]["icon"].configure(image=None, text="?")
+             self.shown_icon = None
 
     def update_current_tab(self):
-        if not self.current_data or 'current' not in self.current_data or 'location' not in self.current_data: return
-        current = self.current_data['current']
-        location = self.current_data['location']
-        self.ui_elements["current"]["temp"].configure(text=f"{current.get('temp_c', '--')}°C")
-        self.ui_elements["current"]["condition"].configure(text=current.get('condition', {}).get('text', 'N/A'))
-        self.ui_elements["current"]["humidity"].configure(text=f"💧 Humidity: {current.get('humidity', '--')}%")
-        self.ui_elements["current"]["wind"].configure(text=f"🌬️ Wind: {current.get('wind_kph', '--')} km/h")
-        self.ui_elements["current"]["pressure"].configure(text=f"🌫️ Pressure: {current.get('pressure_mb', '--')} mb")
-        self.ui_elements["current"]["visibility"].configure(text=f"👁️ Visibility: {current.get('vis_km', '--')} km")
-        try:
-             local_time_str = location.get('localtime', '')
-             local_dt = datetime.strptime(local_time_str, "%Y-%m-%d %H:%M")
-             self.time_label.configure(text=local_dt.strftime("%H:%M"))
-        except ValueError: pass
-        is_day = current.get('is_day', 1)
-        icon_key = 'sun' if is_day else 'moon'
-        self.load_weather_icon(ICON_PATHS.get(icon_key), size=(120, 120))
+        self.loading_tabs.discard("current")
+        report = self.current_data
+        if report is None or report.current is None or report.location is None: return
+        current, value = report.current, weather_model.format_value
+        self.view.set(self.ui_elements["current"]["temp"], f"{value(current.temp_c, '--')}°C")
+        self.view.set(self.ui_elements["current"]["condition"], current.condition.text)
+        self.view.set(self.ui_elements["current"]["humidity"], f"💧 Humidity: {value(current.humidity, '--')}%")
+        self.view.set(self.ui_elements["current"]["wind"], f"🌬️ Wind: {value(current.wind_kph, '--')} km/h")
+        self.view.set(self.ui_elements["current"]["pressure"], f"🌫️ Pressure: {value(current.pressure_mb, '--')} mb")
+        self.view.set(self.ui_elements["current"]["visibility"], f"👁️ Visibility: {value(current.vis_km, '--')} km")
+        local_time = weather_model.local_seconds(report.location.localtime)
+        if local_time is not None:
+             self.view.set(self.time_label, weather_model.format_clock(local_time))
+        icon_key = self.icons.condition_icon(current.condition.icon, current.is_day)
+        self.load_weather_icon(icon_key, size=(120, 120))
 
     def update_hourly_tab(self):
-        for widget in self.hourly_scroll.winfo_children(): widget.destroy()
-        self.ui_elements["hourly"].clear()
-        if not self.forecast_data or 'forecast' not in self.forecast_data or \
-           'forecastday' not in self.forecast_data['forecast'] or \
-           len(self.forecast_data['forecast']['forecastday']) == 0 or \
-           'hour' not in self.forecast_data['forecast']['forecastday'][0]:
-            ctk.CTkLabel(self.hourly_scroll, text="Hourly data not available.", text_color=TEXT_COLOR).pack(pady=20)
+        started = time.perf_counter()
+        self.loading_tabs.discard("hourly")
+        table = self.ui_elements["hourly"]
+        hourly = self.forecast_data.hourly if self.forecast_data is not None else None
+        if not hourly:
+            table.show_status("Hourly data not available.")
             return
-        hours = self.forecast_data['forecast']['forecastday'][0]['hour']
-        header_frame = ctk.CTkFrame(self.hourly_scroll, fg_color=ACCENT_COLOR, corner_radius=6)
-        header_frame.pack(fill="x", pady=(0, 5), padx=5)
-        ctk.CTkLabel(header_frame, text="Time", width=70, font=("Arial", 13, "bold"), text_color="white").pack(side="left", padx=10, pady=3)
-        ctk.CTkLabel(header_frame, text="Temp", width=60, font=("Arial", 13, "bold"), text_color="white").pack(side="left", padx=10, pady=3)
-        ctk.CTkLabel(header_frame, text="Condition", font=("Arial", 13, "bold"), text_color="white", anchor='w').pack(side="left", padx=10, pady=3, fill='x', expand=True)
-        ctk.CTkLabel(header_frame, text="Wind (km/h)", width=100, font=("Arial", 13, "bold"), text_color="white").pack(side="left", padx=10, pady=3)
-        self.ui_elements["hourly"].append(header_frame)
-        for i, hour in enumerate(hours):
-            try: time_str = datetime.strptime(hour.get('time', ''), "%Y-%m-%d %H:%M").strftime("%H:%M")
-            except ValueError: time_str = "--:--"
-            temp, condition, wind = hour.get('temp_c', '-'), hour.get('condition', {}).get('text', 'N/A'), hour.get('wind_kph', '-')
-            bg_color = "white" if i % 2 == 0 else "#F0F0F0"
-            frame = ctk.CTkFrame(self.hourly_scroll, corner_radius=6, fg_color=bg_color)
-            frame.pack(fill="x", pady=2, padx=5)
-            ctk.CTkLabel(frame, text=time_str, width=70, font=("Arial", 14), text_color=TEXT_COLOR, anchor='w').pack(side="left", padx=10, pady=4)
-            ctk.CTkLabel(frame, text=f"{temp}°C", width=60, font=("Arial", 14, "bold"), text_color=TEXT_COLOR, anchor='w').pack(side="left", padx=10, pady=4)
-            ctk.CTkLabel(frame, text=condition, font=("Arial", 14), text_color=TEXT_COLOR, anchor='w', justify='left').pack(side="left", padx=10, pady=4, fill='x', expand=True)
-            ctk.CTkLabel(frame, text=f"{wind}", width=100, font=("Arial", 14), text_color=TEXT_COLOR, anchor='center').pack(side="left", padx=10, pady=4)
-            self.ui_elements["hourly"].append(frame)
+        value = weather_model.format_value
+        rows = []
+        for row in range(len(hourly)):
+            rows.append((weather_model.format_hour(hourly.local_time[row]), f"{value(hourly.temp_c[row])}°C",
+                         hourly.condition_at(row).text, f"{value(hourly.wind_kph[row])}"))
+        table.render(rows)
+        self.metrics["render_hourly_ms"] = (time.perf_counter() - started) * 1000
 
     def update_daily_tab(self):
-        for widget in self.daily_scroll.winfo_children(): widget.destroy()
-        self.ui_elements["daily"].clear()
-        if not self.forecast_data or 'forecast' not in self.forecast_data or \
-           'forecastday' not in self.forecast_data['forecast']:
-            ctk.CTkLabel(self.daily_scroll, text="Daily data not available.", text_color=TEXT_COLOR).pack(pady=20)
+        started = time.perf_counter()
+        self.loading_tabs.discard("daily")
+        pool = self.ui_elements["daily"]
+        daily = self.forecast_data.daily if self.forecast_data is not None else None
+        if daily is None:
+            pool.show_status("Daily data not available.")
             return
-        days = self.forecast_data['forecast']['forecastday']
-        header_frame = ctk.CTkFrame(self.daily_scroll, fg_color=ACCENT_COLOR, corner_radius=6)
-        header_frame.pack(fill="x", pady=(0, 5), padx=5)
-        ctk.CTkLabel(header_frame, text="Date", width=120, font=("Arial", 13, "bold"), text_color="white").pack(side="left", padx=10, pady=3)
-        ctk.CTkLabel(header_frame, text="Temp (°C)", width=120, font=("Arial", 13, "bold"), text_color="white").pack(side="left", padx=10, pady=3)
-        ctk.CTkLabel(header_frame, text="Condition", font=("Arial", 13, "bold"), text_color="white", anchor='w').pack(side="left", padx=10, pady=3, fill='x', expand=True)
-        ctk.CTkLabel(header_frame, text="Rain (%)", width=80, font=("Arial", 13, "bold"), text_color="white").pack(side="left", padx=10, pady=3)
-        self.ui_elements["daily"].append(header_frame)
-        for i, day_data in enumerate(days):
-            day_info = day_data.get('day', {})
-            try: date_str = datetime.strptime(day_data.get('date', ''), "%Y-%m-%d").strftime("%a, %d %b")
-            except ValueError: date_str = "---"
-            max_temp, min_temp = day_info.get('maxtemp_c', '-'), day_info.get('mintemp_c', '-')
-            condition, rain_chance = day_info.get('condition', {}).get('text', 'N/A'), day_info.get('daily_chance_of_rain', '-')
-            bg_color = "white" if i % 2 == 0 else "#F0F0F0"
-            frame = ctk.CTkFrame(self.daily_scroll, corner_radius=6, fg_color=bg_color)
-            frame.pack(fill="x", pady=2, padx=5)
-            ctk.CTkLabel(frame, text=date_str, width=120, font=("Arial", 14), text_color=TEXT_COLOR, anchor='w').pack(side="left", padx=10, pady=4)
-            ctk.CTkLabel(frame, text=f"↑{max_temp}° ↓{min_temp}°", width=120, font=("Arial", 14, "bold"), text_color=TEXT_COLOR, anchor='w').pack(side="left", padx=10, pady=4)
-            ctk.CTkLabel(frame, text=condition, font=("Arial", 14), text_color=TEXT_COLOR, anchor='w', justify='left').pack(side="left", padx=10, pady=4, fill='x', expand=True)
-            ctk.CTkLabel(frame, text=f"{rain_chance}%", width=80, font=("Arial", 14), text_color=TEXT_COLOR, anchor='center').pack(side="left", padx=10, pady=4)
-            self.ui_elements["daily"].append(frame)
+        value = weather_model.format_value
+        summary = weather_analytics.daily_summary(self.forecast_data) if weather_analytics is not None else None
+        rows = []
+        for row in range(len(daily)):
+            date_str = daily.date_at(row).strftime("%a, %d %b")
+            cells = (date_str, f"↑{value(daily.maxtemp_c[row])}° ↓{value(daily.mintemp_c[row])}°", daily.condition_at(row).text)
+            if weather_analytics is None:
+                rows.append(cells + (f"{daily.chance_of_rain[row]}%",))
+                continue
+            index = weather_analytics.summary_row(summary, daily, row)
+            if index is None:
+                rows.append(cells + ("-", f"{daily.chance_of_rain[row]}%"))
+                continue
+            low, high = summary.min_feels_like[index], summary.max_feels_like[index]
+            feels = "-" if math.isnan(low) else f"{low:.0f}° … {high:.0f}°"
+            rows.append(cells + (feels, f"{daily.chance_of_rain[row]}% · {summary.rain_hours[index]}h"))
+        pool.render(rows)
+        self.metrics["render_daily_ms"] = (time.perf_counter() - started) * 1000
 
     def update_astro_tab(self):
-        if not self.astro_data or 'astronomy' not in self.astro_data or 'astro' not in self.astro_data['astronomy']:
-             self.ui_elements["astro"]["sunrise"].configure(text="🌅 Sunrise: --:--")
-             self.ui_elements["astro"]["sunset"].configure(text="🌇 Sunset: --:--")
-             self.ui_elements["astro"]["moonrise"].configure(text="🌄 Moonrise: --:--")
-             self.ui_elements["astro"]["moonset"].configure(text="🌃 Moonset: --:--")
-             self.ui_elements["astro"]["moon_phase"].configure(text="🌖 Moon Phase: --")
-             self.ui_elements["astro"]["moon_illumination"].configure(text="🌕 Illumination: --%")
+        self.loading_tabs.discard("astro")
+        astro = astro_for_day(self.astro_data)
+        if astro is None:
+             self.view.set(self.ui_elements["astro"]["sunrise"], "🌅 Sunrise: --:--")
+             self.view.set(self.ui_elements["astro"]["sunset"], "🌇 Sunset: --:--")
+             self.view.set(self.ui_elements["astro"]["moonrise"], "🌄 Moonrise: --:--")
+             self.view.set(self.ui_elements["astro"]["moonset"], "🌃 Moonset: --:--")
+             self.view.set(self.ui_elements["astro"]["moon_phase"], "🌖 Moon Phase: --")
+             self.view.set(self.ui_elements["astro"]["moon_illumination"], "🌕 Illumination: --%")
              return
-        astro = self.astro_data['astronomy']['astro']
-        self.ui_elements["astro"]["sunrise"].configure(text=f"🌅 Sunrise: {astro.get('sunrise', '--:--')}")
-        self.ui_elements["astro"]["sunset"].configure(text=f"🌇 Sunset: {astro.get('sunset', '--:--')}")
-        self.ui_elements["astro"]["moonrise"].configure(text=f"🌄 Moonrise: {astro.get('moonrise', '--:--')}")
-        self.ui_elements["astro"]["moonset"].configure(text=f"🌃 Moonset: {astro.get('moonset', '--:--')}")
-        self.ui_elements["astro"]["moon_phase"].configure(text=f"🌖 Moon Phase: {astro.get('moon_phase', 'N/A')}")
-        self.ui_elements["astro"]["moon_illumination"].configure(text=f"🌕 Illumination: {astro.get('moon_illumination', '--')}%")
+        self.view.set(self.ui_elements["astro"]["sunrise"], f"🌅 Sunrise: {astro.sunrise}")
+        self.view.set(self.ui_elements["astro"]["sunset"], f"🌇 Sunset: {astro.sunset}")
+        self.view.set(self.ui_elements["astro"]["moonrise"], f"🌄 Moonrise: {astro.moonrise}")
+        self.view.set(self.ui_elements["astro"]["moonset"], f"🌃 Moonset: {astro.moonset}")
+        self.view.set(self.ui_elements["astro"]["moon_phase"], f"🌖 Moon Phase: {astro.moon_phase}")
+        self.view.set(self.ui_elements["astro"]["moon_illumination"], f"🌕 Illumination: {astro.moon_illumination}%")
 
     def process_chat_input_wrapper(self, event=None):
          message = self.chat_input.get().strip()
          if not message: return
          self.chat_input.delete(0, "end")
          self._add_chat_message("You: " + message, is_user=True)
-         response = self.chatbot.process_message(message)
-         self._add_chat_message("Bot: " + response, is_user=False)
-         self.app.after(50, lambda: self.chat_history._parent_canvas.yview_moveto(1.0))
+         # The reply is resolved on a worker; its bubble is filled in by id, so several
+         # questions can be in flight and each answer lands in its own bubble
+         pending_id = self._add_chat_message(CHAT_PENDING_TEXT, is_user=False)
+         default_city = self.last_city
+         self.run_in_background(
+             lambda: self.chatbot.process_message(message, default_city=default_city),
+             on_success=lambda response: self.ui_elements["chat"].update(pending_id, "Bot: " + response),
+             on_error=lambda e: self.ui_elements["chat"].update(pending_id, f"Bot: ❌ Error: {e}")
+         )
 
     def _add_chat_message(self, text, is_user=False):
-        bubble_color = USER_MSG_BG if is_user else BOT_MSG_BG
-        text_align = "left"
-        frame_anchor = "w"
-        padx = (5, 60) if is_user else (5, 5)
-        is_error = text.startswith("Bot: ❌ Error:")
-        if is_error:
-            bubble_color = ERROR_COLOR # USE SOLID COLOR
-            padx = (5, 5)
-        frame = ctk.CTkFrame(self.chat_history, fg_color=bubble_color, corner_radius=12)
-        frame.pack(fill="x", pady=(2, 5), padx=padx, anchor=frame_anchor)
-        try: wrap_width = max(100, self.chat_history.winfo_width() - padx[0] - padx[1] - 20)
-        except Exception: wrap_width = 500
-        label = ctk.CTkLabel(frame, text=text, wraplength=wrap_width, justify=text_align,
-                           font=("Arial", 14), text_color=TEXT_COLOR, anchor="w")
-        label.pack(padx=10, pady=6, fill="x", expand=True)
-        self.ui_elements["chat"].append(frame)
-        self.app.after(50, lambda: self.chat_history._parent_canvas.yview_moveto(1.0))
-        self.chat_history.bind("<Configure>", lambda e, lbl=label, p=padx: self._update_wraplength(e, lbl, p))
-
-    def _update_wraplength(self, event, label, padding):
-        try:
-             new_wraplength = max(100, event.width - padding[0] - padding[1] - 20)
-             label.configure(wraplength=new_wraplength)
-        except Exception: pass
+        return self.ui_elements["chat"].add(text, is_user=is_user)
 
     def clear_ui_data(self):
-        self.ui_elements["current"]["temp"].configure(text="--°C")
-        self.ui_elements["current"]["condition"].configure(text="Loading...")
-        self.ui_elements["current"]["humidity"].configure(text="💧 Humidity: --%")
-        self.ui_elements["current"]["wind"].configure(text="🌬️ Wind: -- km/h")
-        self.ui_elements["current"]["pressure"].configure(text="🌫️ Pressure: -- mb")
-        self.ui_elements["current"]["visibility"].configure(text="👁️ Visibility: -- km")
-        self.load_weather_icon(ICON_PATHS.get('sun'), size=(120, 120)) # Attempt default icon load
-        for widget in self.hourly_scroll.winfo_children(): widget.destroy()
-        self.ui_elements["hourly"].clear()
-        ctk.CTkLabel(self.hourly_scroll, text="Loading hourly data...", text_color=TEXT_COLOR).pack(pady=20)
-        for widget in self.daily_scroll.winfo_children(): widget.destroy()
-        self.ui_elements["daily"].clear()
-        ctk.CTkLabel(self.daily_scroll, text="Loading daily data...", text_color=TEXT_COLOR).pack(pady=20)
-        self.ui_elements["astro"]["sunrise"].configure(text="🌅 Sunrise: --:--")
-        self.ui_elements["astro"]["sunset"].configure(text="🌇 Sunset: --:--")
-        self.ui_elements["astro"]["moonrise"].configure(text="🌄 Moonrise: --:--")
-        self.ui_elements["astro"]["moonset"].configure(text="🌃 Moonset: --:--")
-        self.ui_elements["astro"]["moon_phase"].configure(text="🌖 Moon Phase: --")
-        self.ui_elements["astro"]["moon_illumination"].configure(text="🌕 Illumination: --%")
+        self.loading_tabs = {"current", "hourly", "daily", "astro"}
+        self.view.set(self.ui_elements["current"]["temp"], "--°C")
+        self.view.set(self.ui_elements["current"]["condition"], "Loading...")
+        self.view.set(self.ui_elements["current"]["humidity"], "💧 Humidity: --%")
+        self.view.set(self.ui_elements["current"]["wind"], "🌬️ Wind: -- km/h")
+        self.view.set(self.ui_elements["current"]["pressure"], "🌫️ Pressure: -- mb")
+        self.view.set(self.ui_elements["current"]["visibility"], "👁️ Visibility: -- km")
+        self.load_weather_icon('sun', size=(120, 120)) # Attempt default icon load
+        self.ui_elements["hourly"].show_status("Loading hourly data...")
+        self.ui_elements["daily"].show_status("Loading daily data...")
+        self.view.set(self.ui_elements["astro"]["sunrise"], "🌅 Sunrise: --:--")
+        self.view.set(self.ui_elements["astro"]["sunset"], "🌇 Sunset: --:--")
+        self.view.set(self.ui_elements["astro"]["moonrise"], "🌄 Moonrise: --:--")
+        self.view.set(self.ui_elements["astro"]["moonset"], "🌃 Moonset: --:--")
+        self.view.set(self.ui_elements["astro"]["moon_phase"], "🌖 Moon Phase: Loading...")
+        self.view.set(self.ui_elements["astro"]["moon_illumination"], "🌕 Illumination: --%")
 
     def show_loading(self, show=True):
+        # The entry stays editable while loading so a new search can supersede the running one
         if show:
-            self.search_btn.configure(text="...", state="disabled")
-            self.location_entry.configure(state="disabled")
+            self.search_btn.configure(text="...")
         else:
-            self.search_btn.configure(text="Search", state="normal")
-            self.location_entry.configure(state="normal")
-            for widget in self.hourly_scroll.winfo_children():
-                 if isinstance(widget, ctk.CTkLabel) and "Loading" in widget.cget("text"): widget.destroy()
-            for widget in self.daily_scroll.winfo_children():
-                 if isinstance(widget, ctk.CTkLabel) and "Loading" in widget.cget("text"): widget.destroy()
+            self.search_btn.configure(text="Search")
+            # Tabs whose data never arrived drop their placeholder instead of loading forever
+            if "current" in self.loading_tabs: self.view.set(self.ui_elements["current"]["condition"], "N/A")
+            if "hourly" in self.loading_tabs: self.ui_elements["hourly"].show_status("Hourly data not available.")
+            if "daily" in self.loading_tabs: self.ui_elements["daily"].show_status("Daily data not available.")
+            if "astro" in self.loading_tabs: self.view.set(self.ui_elements["astro"]["moon_phase"], "🌖 Moon Phase: --")
+            self.loading_tabs.clear()
 
     def show_error(self, message):
         error_message = f"Bot: ❌ Error: {message}"
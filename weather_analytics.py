@@ -0,0 +1,132 @@
+import warnings
+import weakref
+
+import numpy as np
+
+# --- Analytics Settings ---
+RAIN_HOUR_MM = 0.1 # An hour with at least this much precipitation counts as rainy
+HEAT_INDEX_MIN_C = 26.7 # 80°F; below this the heat index is just the air temperature
+WIND_CHILL_MAX_C = 10.0
+WIND_CHILL_MIN_KPH = 4.8
+MAGNUS_A, MAGNUS_B = 17.625, 243.04 # Magnus dew point coefficients (°C)
+
+
+# --- Derived Metrics (element-wise, any array shape) ---
+def dew_point(temp_c, humidity):
+    rh = np.clip(humidity, 1, 100) / 100.0
+    gamma = np.log(rh) + MAGNUS_A * temp_c / (MAGNUS_B + temp_c)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+def heat_index(temp_c, humidity):
+    # NWS: Steadman's simple formula, switching to the Rothfusz regression (with its
+    # low/high humidity adjustments) once the result reaches 80°F
+    t = temp_c * 9 / 5 + 32
+    rh = humidity
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh - 6.83783e-3 * t * t
+            - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+    dry = (rh < 13) & (t >= 80) & (t <= 112)
+    full = np.where(dry, full - (13 - rh) / 4 * np.sqrt(np.clip(17 - np.abs(t - 95), 0, None) / 17), full)
+    humid = (rh > 85) & (t >= 80) & (t <= 87)
+    full = np.where(humid, full + (rh - 85) / 10 * (87 - t) / 5, full)
+    result_f = np.where((simple + t) / 2 >= 80, full, simple)
+    return np.where(temp_c >= HEAT_INDEX_MIN_C, (result_f - 32) * 5 / 9, temp_c)
+
+def wind_chill(temp_c, wind_kph):
+    # Environment Canada / NWS 2001 formula; defined only for cold, moving air
+    v = np.power(np.clip(wind_kph, 0, None), 0.16)
+    chill = 13.12 + 0.6215 * temp_c - 11.37 * v + 0.3965 * temp_c * v
+    return np.where((temp_c <= WIND_CHILL_MAX_C) & (wind_kph > WIND_CHILL_MIN_KPH), chill, temp_c)
+
+def feels_like(temp_c, humidity, wind_kph):
+    return np.where(temp_c >= HEAT_INDEX_MIN_C, heat_index(temp_c, humidity), wind_chill(temp_c, wind_kph))
+
+
+# --- Daily Summaries ---
+class DailySummary:
+    # One value per forecast day, aligned with report.daily rows
+    __slots__ = ("day", "min_temp", "max_temp", "mean_temp", "rain_hours", "peak_wind",
+                 "mean_dew_point", "max_heat_index", "min_wind_chill", "min_feels_like", "max_feels_like")
+
+    def __init__(self, **columns):
+        for name in self.__slots__: setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.day)
+
+
+def hourly_arrays(hourly):
+    # Zero-copy views over the model's array columns
+    return {
+        "local_time": np.frombuffer(hourly.local_time, dtype=np.int64),
+        "temp_c": np.frombuffer(hourly.temp_c, dtype=np.float64),
+        "wind_kph": np.frombuffer(hourly.wind_kph, dtype=np.float64),
+        "humidity": np.frombuffer(hourly.humidity, dtype=np.uint8).astype(np.float64),
+        "precip_mm": np.frombuffer(hourly.precip_mm, dtype=np.float64)
+    }
+
+def summarize(reports):
+    # Batch over every city: all hours go into one (total days, 24) grid so each metric is a
+    # single vectorized pass, then the rows are split back per city. Missing hours stay NaN.
+    reports = list(reports)
+    columns, day_ids, hours, bounds = [], [], [], []
+    first_row = 0
+    for report in reports:
+        hourly = report.hourly
+        if not hourly:
+            bounds.append((first_row, first_row, None))
+            continue
+        arrays = hourly_arrays(hourly)
+        day_number = arrays["local_time"] // 86400
+        first_day = int(day_number.min())
+        span = int(day_number.max()) - first_day + 1
+        columns.append(arrays)
+        day_ids.append(day_number - first_day + first_row)
+        hours.append(arrays["local_time"] % 86400 // 3600)
+        bounds.append((first_row, first_row + span, first_day))
+        first_row += span
+    if not columns: return [None] * len(reports)
+
+    rows, cols = np.concatenate(day_ids), np.concatenate(hours)
+    def grid(name):
+        out = np.full((first_row, 24), np.nan)
+        out[rows, cols] = np.concatenate([arrays[name] for arrays in columns])
+        return out
+    temp, humidity, wind, precip = grid("temp_c"), grid("humidity"), grid("wind_kph"), grid("precip_mm")
+    feels = feels_like(temp, humidity, wind)
+    with warnings.catch_warnings():
+        # nanmin/nanmean warn on all-NaN rows (a day without hourly data); those rows just stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        totals = {
+            "min_temp": np.nanmin(temp, axis=1), "max_temp": np.nanmax(temp, axis=1), "mean_temp": np.nanmean(temp, axis=1),
+            "rain_hours": np.sum(precip >= RAIN_HOUR_MM, axis=1), "peak_wind": np.nanmax(wind, axis=1),
+            "mean_dew_point": np.nanmean(dew_point(temp, humidity), axis=1),
+            "max_heat_index": np.nanmax(heat_index(temp, humidity), axis=1),
+            "min_wind_chill": np.nanmin(wind_chill(temp, wind), axis=1),
+            "min_feels_like": np.nanmin(feels, axis=1), "max_feels_like": np.nanmax(feels, axis=1)
+        }
+    summaries = []
+    for start, stop, first_day in bounds:
+        if first_day is None:
+            summaries.append(None)
+            continue
+        days = np.arange(first_day, first_day + stop - start)
+        summaries.append(DailySummary(day=days, **{name: values[start:stop] for name, values in totals.items()}))
+    return summaries
+
+
+_summaries = weakref.WeakKeyDictionary()
+
+def daily_summary(report):
+    # Computed once per cached report; a refreshed payload is a new report and gets its own
+    try: return _summaries[report]
+    except KeyError: pass
+    summary = summarize([report])[0]
+    _summaries[report] = summary
+    return summary
+
+def summary_row(summary, daily, row):
+    # Summary index for report.daily row `row`, or None
+    if summary is None or row is None: return None
+    index = daily.day[row] - int(summary.day[0])
+    return index if 0 <= index < len(summary) else None
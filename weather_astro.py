@@ -0,0 +1,192 @@
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+from weather_model import EPOCH_ORDINAL, Astro
+
+# --- Astronomy Settings ---
+SUN_ZENITH = 90.833 # Refraction + solar disc, the NOAA convention for sunrise and sunset
+MOON_STEP_MIN = 10 # Moon altitude sampling step when searching for moonrise/moonset
+JD_UNIX_EPOCH = 2440587.5 # Julian day of 1970-01-01 00:00 UTC
+J2000 = 2451545.0
+PHASE_NAMES = ("New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
+               "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent")
+
+_rad, _deg = np.radians, np.degrees
+def _sin(x): return np.sin(_rad(x))
+def _cos(x): return np.cos(_rad(x))
+
+
+# --- Sun (NOAA solar calculator equations) ---
+def _sun(jd):
+    # -> declination (rad), equation of time (min), apparent longitude (deg)
+    t = (jd - J2000) / 36525
+    l0 = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360
+    m = 357.52911 + t * (35999.05029 - 0.0001537 * t)
+    e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    c = _sin(m) * (1.914602 - t * (0.004817 + 0.000014 * t)) + _sin(2 * m) * (0.019993 - 0.000101 * t) + _sin(3 * m) * 0.000289
+    omega = 125.04 - 1934.136 * t
+    app_long = l0 + c - 0.00569 - 0.00478 * _sin(omega)
+    obliq = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60 + 0.00256 * _cos(omega)
+    decl = np.arcsin(_sin(obliq) * _sin(app_long))
+    y = np.tan(_rad(obliq) / 2) ** 2
+    eq_time = 4 * _deg(y * _sin(2 * l0) - 2 * e * _sin(m) + 4 * e * y * _sin(m) * _cos(2 * l0)
+                       - 0.5 * y * y * _sin(4 * l0) - 1.25 * e * e * _sin(2 * m))
+    return decl, eq_time, app_long
+
+def _sun_event_utc(lat, lon, jd_midnight, utc_min, sign):
+    # One refinement step: solar position is re-evaluated at the estimated event time
+    decl, eq_time, _ = _sun(jd_midnight + utc_min / 1440)
+    lat_r = _rad(lat)
+    with np.errstate(invalid="ignore"):
+        hour_angle = _deg(np.arccos(_cos(SUN_ZENITH) / (np.cos(lat_r) * np.cos(decl)) - np.tan(lat_r) * np.tan(decl)))
+    return 720 - 4 * lon - eq_time + sign * 4 * hour_angle
+
+def sun_events(lat, lon, day, utc_offset_min):
+    # day: local dates as days since 1970-01-01. Returns local minutes after midnight for
+    # sunrise and sunset; NaN where the sun never rises or never sets (polar day/night)
+    jd_midnight = JD_UNIX_EPOCH + np.asarray(day, dtype=np.float64)
+    noon = 720 - 4 * np.asarray(lon) - _sun(jd_midnight + 0.5 - np.asarray(lon) / 360)[1]
+    events = []
+    for sign in (-1, 1):
+        utc = _sun_event_utc(lat, lon, jd_midnight, noon, sign)
+        utc = _sun_event_utc(lat, lon, jd_midnight, np.where(np.isnan(utc), noon, utc), sign)
+        events.append(utc + utc_offset_min)
+    return events[0], events[1]
+
+
+# --- Moon (Astronomical Almanac low-precision series, ~0.3° in position) ---
+def _moon(jd):
+    # -> ecliptic longitude, latitude and horizontal parallax, all in degrees
+    t = (jd - J2000) / 36525
+    lon = (218.32 + 481267.881 * t + 6.29 * _sin(135.0 + 477198.87 * t) - 1.27 * _sin(259.3 - 413335.36 * t)
+           + 0.66 * _sin(235.7 + 890534.22 * t) + 0.21 * _sin(269.9 + 954397.74 * t)
+           - 0.19 * _sin(357.5 + 35999.05 * t) - 0.11 * _sin(186.5 + 966404.03 * t))
+    lat = (5.13 * _sin(93.3 + 483202.02 * t) + 0.28 * _sin(228.2 + 960400.89 * t)
+           - 0.28 * _sin(318.3 + 6003.15 * t) - 0.17 * _sin(217.6 - 407332.21 * t))
+    parallax = (0.9508 + 0.0518 * _cos(135.0 + 477198.87 * t) + 0.0095 * _cos(259.3 - 413335.36 * t)
+                + 0.0078 * _cos(235.7 + 890534.22 * t) + 0.0028 * _cos(269.9 + 954397.74 * t))
+    return lon % 360, lat, parallax
+
+def _moon_altitude(lat, lon, jd):
+    # Geocentric altitude (deg) and the rise/set threshold h0 = 0.7275 * parallax - 34'
+    moon_lon, moon_lat, parallax = _moon(jd)
+    d = jd - J2000
+    obliq = 23.439291 - 0.0130042 * d / 36525
+    x = _cos(moon_lat) * _cos(moon_lon)
+    y = _cos(obliq) * _cos(moon_lat) * _sin(moon_lon) - _sin(obliq) * _sin(moon_lat)
+    z = _sin(obliq) * _cos(moon_lat) * _sin(moon_lon) + _cos(obliq) * _sin(moon_lat)
+    ra, dec = np.arctan2(y, x), np.arcsin(np.clip(z, -1, 1))
+    hour_angle = _rad(280.46061837 + 360.98564736629 * d + lon) - ra
+    lat_r = _rad(lat)
+    altitude = _deg(np.arcsin(np.sin(lat_r) * np.sin(dec) + np.cos(lat_r) * np.cos(dec) * np.cos(hour_angle)))
+    return altitude - (0.7275 * parallax - 0.5667)
+
+def moon_events(lat, lon, day, utc_offset_min):
+    # Samples the Moon's altitude across each local day and interpolates the first upward
+    # and downward horizon crossings. Returns local minutes; NaN when there is no such event.
+    day = np.asarray(day, dtype=np.float64)
+    shape = np.broadcast(np.asarray(lat), np.asarray(lon), day, np.asarray(utc_offset_min)).shape
+    minutes = np.arange(0, 1440 + MOON_STEP_MIN, MOON_STEP_MIN, dtype=np.float64)
+    expand = lambda value: np.broadcast_to(np.asarray(value, dtype=np.float64), shape)[..., None]
+    jd = JD_UNIX_EPOCH + expand(day) + (minutes - expand(utc_offset_min)) / 1440
+    height = _moon_altitude(expand(lat), expand(lon), jd)
+    before, after = height[..., :-1], height[..., 1:]
+    fraction = before / np.where(before == after, 1, before - after)
+    crossing = minutes[:-1] + fraction * MOON_STEP_MIN
+    rises = (before < 0) & (after >= 0)
+    sets = (before >= 0) & (after < 0)
+    first = lambda mask: np.where(mask.any(axis=-1), np.take_along_axis(crossing, mask.argmax(axis=-1)[..., None], axis=-1)[..., 0], np.nan)
+    return first(rises), first(sets)
+
+def moon_phase(day, utc_offset_min):
+    # Illuminated fraction (%) and phase name index at local noon
+    jd = JD_UNIX_EPOCH + np.asarray(day, dtype=np.float64) + (720 - np.asarray(utc_offset_min)) / 1440
+    moon_lon, moon_lat, _ = _moon(jd)
+    sun_lon = _sun(jd)[2]
+    age = (moon_lon - sun_lon) % 360
+    illumination = (1 - _cos(moon_lat) * _cos(age)) / 2 * 100
+    phase = ((age + 22.5) % 360 // 45).astype(int)
+    return illumination, phase
+
+
+# --- Batch API ---
+def compute(lat, lon, day, utc_offset_min):
+    # Everything broadcasts: one city over a year, many cities on one day, or both
+    sunrise, sunset = sun_events(lat, lon, day, utc_offset_min)
+    moonrise, moonset = moon_events(lat, lon, day, utc_offset_min)
+    illumination, phase = moon_phase(day, utc_offset_min)
+    return {"sunrise": sunrise, "sunset": sunset, "moonrise": moonrise, "moonset": moonset,
+            "moon_illumination": illumination, "moon_phase": phase}
+
+EVENT_FIELDS = ("sunrise", "sunset", "moonrise", "moonset")
+
+def format_time(minutes, missing):
+    # Same "hh:mm AM" text as weatherapi's astro block
+    if np.isnan(minutes): return missing
+    total = int(np.floor(minutes + 0.5)) % 1440
+    hour, minute = divmod(total, 60)
+    return f"{hour % 12 or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+def _zone(location):
+    if ZoneInfo is None or not location.tz_id: return None
+    try: return ZoneInfo(location.tz_id)
+    except Exception: return None
+
+def utc_offsets(location, days, hour=12):
+    # Per-day offsets (minutes) at the given local hour from the IANA zone when available, so DST
+    # changes inside the range are honoured; otherwise the payload's current offset for every day
+    zone = _zone(location)
+    if zone is not None:
+        dates = (date.fromordinal(int(day) + EPOCH_ORDINAL) for day in days)
+        return np.array([datetime(d.year, d.month, d.day, hour, tzinfo=zone).utcoffset().total_seconds() / 60 for d in dates])
+    offset = location.utc_offset
+    return np.full(len(days), np.nan if offset is None else offset / 60)
+
+def _offset_change(zone, start_utc_min, offset):
+    # First UTC minute (since 1970) after start at which the zone's offset is no longer `offset`
+    for step in range(0, 1500, 15):
+        moment = datetime.fromtimestamp((start_utc_min + step) * 60, timezone.utc)
+        if moment.astimezone(zone).utcoffset().total_seconds() / 60 != offset: return start_utc_min + step
+    return None
+
+def _fix_transition_days(location, days, offsets, result):
+    # compute() treats each day as 24 h at its noon offset. Clocks change overnight, so a day
+    # whose midnight offset differs is a DST change day: the events before the change are
+    # computed again with the midnight offset, and each event keeps whichever reading falls
+    # on its own side of the change.
+    zone = _zone(location)
+    if zone is None: return
+    midnights = utc_offsets(location, days, 0)
+    for i in np.flatnonzero(midnights != offsets):
+        day, before_offset, after_offset = int(days[i]), midnights[i], offsets[i]
+        change = _offset_change(zone, day * 1440 - before_offset, before_offset)
+        if change is None: continue
+        before = compute(location.lat, location.lon, day, before_offset)
+        after = compute(location.lat, location.lon, day, after_offset)
+        for field in EVENT_FIELDS:
+            early, late = float(before[field]), float(after[field])
+            if not np.isnan(early) and day * 1440 + early - before_offset < change: result[field][i] = early
+            elif not np.isnan(late) and day * 1440 + late - after_offset >= change: result[field][i] = late
+            else: result[field][i] = np.nan
+
+def astro_for(location, days):
+    # Astro records for the given local days (days since 1970-01-01) at a report's location
+    days = np.atleast_1d(np.asarray(days, dtype=np.int64))
+    offsets = utc_offsets(location, days)
+    if np.isnan(location.lat) or np.isnan(location.lon) or np.isnan(offsets).any(): return [None] * len(days)
+    result = compute(location.lat, location.lon, days, offsets)
+    _fix_transition_days(location, days, offsets, result)
+    records = []
+    for i in range(len(days)):
+        records.append(Astro({
+            "sunrise": format_time(result["sunrise"][i], "No sunrise"), "sunset": format_time(result["sunset"][i], "No sunset"),
+            "moonrise": format_time(result["moonrise"][i], "No moonrise"), "moonset": format_time(result["moonset"][i], "No moonset"),
+            "moon_phase": PHASE_NAMES[result["moon_phase"][i]], "moon_illumination": int(round(result["moon_illumination"][i]))
+        }))
+    return records
@@ -0,0 +1,270 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# --- Cache Settings ---
+CACHE_TTLS = {
+    "current": 5 * 60, # Seconds
+    "forecast": 30 * 60
+} # "astronomy" entries live until local midnight at the queried location
+DEFAULT_TTL = 5 * 60
+FALLBACK_ASTRO_TTL = 6 * 60 * 60 # Used when the payload carries no local time
+CACHE_MAX_ENTRIES = 64
+
+# --- Disk Cache Settings ---
+APP_CACHE_NAME = "WeatherWise"
+DISK_CACHE_FILE = "responses.sqlite3"
+DISK_CACHE_MAX_AGE = 7 * 24 * 60 * 60 # Stale rows are kept this long for offline use
+DISK_CACHE_MAX_ROWS = 500
+DISK_COMPACT_EVERY = 50 # Writes between compactions
+
+
+def normalize_location(query):
+    # "  new  York" and "New York" must share one cache slot
+    return " ".join(str(query).lower().split())
+
+def seconds_until_local_midnight(data):
+    try:
+        local_dt = datetime.strptime(data['location']['localtime'], "%Y-%m-%d %H:%M")
+    except (KeyError, TypeError, ValueError):
+        return FALLBACK_ASTRO_TTL
+    elapsed = local_dt.hour * 3600 + local_dt.minute * 60
+    return max(60, 24 * 3600 - elapsed)
+
+def user_cache_dir(app_name=APP_CACHE_NAME):
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, app_name)
+
+
+class CacheEntry:
+    __slots__ = ("data", "fetched_at", "expires_at")
+
+    def __init__(self, data, fetched_at, expires_at):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.expires_at
+
+    def age(self, now=None):
+        return (now or time.time()) - self.fetched_at
+
+
+class ResponseCache:
+    # In-memory TTL + LRU cache of API payloads keyed by (normalized location, endpoint).
+    # decode(endpoint, data) turns raw JSON into whatever the memory cache should hold;
+    # the disk cache always stores the raw JSON.
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttls=None, disk=None, decode=None):
+        self.max_entries = max_entries
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.disk = disk
+        self.decode = decode
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, endpoint, data):
+        if endpoint == "astronomy" and "astronomy" not in self.ttls:
+            return seconds_until_local_midnight(data)
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, query, endpoint):
+        entry = self.get_entry(query, endpoint)
+        return entry.data if entry is not None else None
+
+    def get_entry(self, query, endpoint):
+        key = (normalize_location(query), endpoint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.is_fresh():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        # Expired in memory: only a newer row (another instance refreshed it) is worth decoding
+        newer = self._load_from_disk(query, endpoint, newer_than=entry.fetched_at if entry else None)
+        if newer is not None: entry = newer
+        with self._lock:
+            if entry is None or not entry.is_fresh():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def get_stale(self, query, endpoint):
+        # Last known payload regardless of age, for offline fallback and warm starts
+        with self._lock:
+            entry = self._entries.get((normalize_location(query), endpoint))
+        if entry is not None: return entry
+        return self._load_from_disk(query, endpoint)
+
+    def put(self, query, endpoint, data, body=None):
+        # body: the response text/bytes data was decoded from, written to disk as-is
+        now = time.time()
+        raw = CacheEntry(data, now, now + self.ttl_for(endpoint, data))
+        if self.disk: self.disk.put(query, endpoint, raw, body)
+        entry = self._decoded(endpoint, raw)
+        self._store(query, endpoint, entry)
+        return entry
+
+    def _decoded(self, endpoint, entry):
+        if self.decode is None: return entry
+        return CacheEntry(self.decode(endpoint, entry.data), entry.fetched_at, entry.expires_at)
+
+    def remember_search(self, query):
+        if self.disk: self.disk.remember_search(query)
+
+    def recent_searches(self, limit=5):
+        return self.disk.recent_searches(limit) if self.disk else []
+
+    def _store(self, query, endpoint, entry):
+        key = (normalize_location(query), endpoint)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _load_from_disk(self, query, endpoint, newer_than=None):
+        if not self.disk: return None
+        entry = self.disk.get(query, endpoint, newer_than)
+        if entry is None: return None
+        try: entry = self._decoded(endpoint, entry)
+        except Exception as e:
+            print(f"Disk cache decode error for {endpoint} '{query}': {e}")
+            return None
+        self._store(query, endpoint, entry)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class DiskCache:
+    # SQLite-backed store under the user cache dir. WAL mode lets several app
+    # instances read and write concurrently; each thread gets its own connection.
+    def __init__(self, path=None, max_age=DISK_CACHE_MAX_AGE, max_rows=DISK_CACHE_MAX_ROWS):
+        self.path = path or os.path.join(user_cache_dir(), DISK_CACHE_FILE)
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._writes = 0
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                location TEXT NOT NULL, endpoint TEXT NOT NULL, query TEXT NOT NULL,
+                payload TEXT NOT NULL, fetched_at REAL NOT NULL, expires_at REAL NOT NULL,
+                PRIMARY KEY (location, endpoint))""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS searches (
+                location TEXT PRIMARY KEY, query TEXT NOT NULL, searched_at REAL NOT NULL)""")
+        self.compact()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, query, endpoint, newer_than=None):
+        # newer_than: a fetched_at the caller already holds; older or equal rows are not decoded
+        try:
+            row = self._conn().execute(
+                "SELECT payload, fetched_at, expires_at FROM responses WHERE location = ? AND endpoint = ? AND fetched_at > ?",
+                (normalize_location(query), endpoint, newer_than or 0)).fetchone()
+            if row is None: return None
+            return CacheEntry(json.loads(row[0]), row[1], row[2])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Disk cache read error: {e}")
+            return None
+
+    def put(self, query, endpoint, entry, body=None):
+        if body is None: body = json.dumps(entry.data)
+        elif isinstance(body, bytes): body = body.decode("utf-8")
+        try:
+            conn = self._conn()
+            with conn:
+                # Never let a slower writer overwrite a newer payload
+                conn.execute("""INSERT INTO responses (location, endpoint, query, payload, fetched_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (location, endpoint) DO UPDATE SET
+                        query = excluded.query, payload = excluded.payload,
+                        fetched_at = excluded.fetched_at, expires_at = excluded.expires_at
+                    WHERE excluded.fetched_at >= responses.fetched_at""",
+                    (normalize_location(query), endpoint, query, body,
+                     entry.fetched_at, entry.expires_at))
+        except sqlite3.Error as e:
+            print(f"Disk cache write error: {e}")
+            return
+        with self._write_lock:
+            self._writes += 1
+            due = self._writes % DISK_COMPACT_EVERY == 0
+        if due: self.compact()
+
+    def payloads(self, endpoints, limit=None):
+        # (query, endpoint, raw JSON text) for every stored response of these endpoints, newest first
+        marks = ", ".join("?" * len(endpoints))
+        sql = f"SELECT query, endpoint, payload FROM responses WHERE endpoint IN ({marks}) ORDER BY fetched_at DESC"
+        if limit is not None: sql += f" LIMIT {int(limit)}"
+        try: return self._conn().execute(sql, tuple(endpoints)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Disk cache read error: {e}")
+            return []
+
+    def remember_search(self, query):
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO searches (location, query, searched_at) VALUES (?, ?, ?)",
+                             (normalize_location(query), query, time.time()))
+        except sqlite3.Error as e: print(f"Disk cache write error: {e}")
+
+    def recent_searches(self, limit=5):
+        try:
+            rows = self._conn().execute(
+                "SELECT query FROM searches ORDER BY searched_at DESC LIMIT ?", (limit,)).fetchall()
+            return [row[0] for row in rows]
+        except sqlite3.Error as e:
+            print(f"Disk cache read error: {e}")
+            return []
+
+    def compact(self):
+        cutoff = time.time() - self.max_age
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM responses WHERE fetched_at < ?", (cutoff,))
+                conn.execute("""DELETE FROM responses WHERE rowid NOT IN (
+                    SELECT rowid FROM responses ORDER BY fetched_at DESC LIMIT ?)""", (self.max_rows,))
+                conn.execute("""DELETE FROM searches WHERE location NOT IN (
+                    SELECT location FROM searches ORDER BY searched_at DESC LIMIT ?)""", (self.max_rows,))
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e: print(f"Disk cache compaction error: {e}")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,469 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather_cache import DiskCache, ResponseCache, normalize_location, user_cache_dir
+from weather_model import decode_payload, parse_payload
+
+# --- API Settings ---
+API_BASE_URL = "https://api.weatherapi.com/v1/"
+ENDPOINT_PATHS = {
+    "current": "current.json",
+    "forecast": "forecast.json",
+    "astronomy": "astronomy.json"
+}
+ENDPOINT_PARAMS = {"forecast": {"days": 7}}
+DEFAULT_TIMEOUT = 15 # Seconds
+
+# --- Connection Pool Settings ---
+POOL_CONNECTIONS = 4 # Number of hosts to keep pools for
+POOL_MAXSIZE = 8 # Keep-alive connections kept open per host (>= worker threads)
+
+# --- Resilience Settings ---
+STALE_WHILE_REVALIDATE = 6 * 60 * 60 # Seconds a stale entry may be served while a refresh runs
+REVALIDATE_WORKERS = 2
+BREAKER_FAILURE_THRESHOLD = 3 # Consecutive failures before an endpoint is cut off
+BREAKER_BASE_COOLDOWN = 5 # Seconds before the first probe; doubles after each failed probe
+BREAKER_MAX_COOLDOWN = 5 * 60
+
+# --- Rate Limit Settings ---
+RATE_LIMIT_PER_MINUTE = 30 # Client-side cap, well below weatherapi's per-minute throttling
+RATE_LIMIT_BURST = 6 # A search fires its endpoints at once
+BACKGROUND_RESERVE = 3 # Tokens a background refresh must leave for the next search
+BACKGROUND_MAX_WAIT = 2 # Seconds a background refresh waits for a token before giving up
+RETRY_ATTEMPTS = 3 # Extra tries after a 429 or 5xx
+RETRY_BASE_DELAY = 0.5 # Seconds; full jitter over a window that doubles each attempt
+RETRY_MAX_DELAY = 8 # A longer Retry-After is not waited out
+
+# --- Quota Settings ---
+MONTHLY_QUOTA = 1_000_000 # Calls per calendar month on the API plan
+QUOTA_LOW_FRACTION = 0.05 # Below this share of the month's budget, background refreshes are skipped
+QUOTA_FILE = "api_quota.json" # In the cache dir, next to the response cache
+QUOTA_SAVE_EVERY = 10 # Calls between writes of the quota file
+QUOTA_ERROR_CODES = {2007} # weatherapi: monthly quota exceeded
+KEY_ERROR_CODES = {1002, 2006, 2008} # weatherapi: key missing, invalid or disabled
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+class RateLimitedError(requests.exceptions.ConnectionError):
+    # Raised before anything is sent, so callers fall back to cached data as when offline
+    pass
+
+
+def api_error_code(response):
+    # weatherapi error bodies look like {"error": {"code": 2006, "message": "..."}}
+    try: return decode_payload(response.content).get("error", {}).get("code")
+    except (ValueError, AttributeError): return None
+
+def is_quota_error(response):
+    return response.status_code == 429 or api_error_code(response) in QUOTA_ERROR_CODES
+
+def retry_delay(response, attempt):
+    # Seconds before the next try, or None when the server asks for longer than we wait
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try: delay = float(retry_after)
+        except ValueError: delay = None # HTTP-date form; fall back to our own backoff
+        if delay is not None: return delay if delay <= RETRY_MAX_DELAY else None
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class CircuitBreaker:
+    # closed -> open after N failures; once the cooldown passes a single probe
+    # request is let through (half-open) and either closes it or doubles the cooldown
+    def __init__(self, threshold=BREAKER_FAILURE_THRESHOLD, base_cooldown=BREAKER_BASE_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self.cooldown = base_cooldown
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half-open" if self.probing else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None: return True
+            if self.probing or time.monotonic() < self.opened_at + self.cooldown: return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self.opened_at = time.monotonic()
+                self.probing = False
+            elif self.opened_at is None and self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def retry_in(self):
+        with self._lock:
+            if self.opened_at is None: return 0
+            return max(0, self.opened_at + self.cooldown - time.monotonic())
+
+    def cancel_probe(self):
+        # The probe never reached the service (rate limited locally); let the next call probe
+        with self._lock:
+            self.probing = False
+
+
+class TokenBucket:
+    # Refills at `per_minute` tokens a minute up to `capacity`. Background callers only take a
+    # token while `reserve` more remain and no user request is waiting for one.
+    def __init__(self, per_minute=RATE_LIMIT_PER_MINUTE, capacity=RATE_LIMIT_BURST, reserve=BACKGROUND_RESERVE):
+        self.rate = per_minute / 60
+        self.capacity = capacity
+        self.reserve = reserve
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None, background=False):
+        # -> seconds spent waiting, or None when no token came free within timeout (or on close)
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        floor = 1 + self.reserve if background else 1
+        with self._cond:
+            if not background: self.waiting += 1
+            try:
+                while True:
+                    if self.closed: return None
+                    now = time.monotonic()
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= floor and not (background and self.waiting):
+                        self.tokens -= 1
+                        return now - start
+                    wait = max((floor - self.tokens) / self.rate, 0.05)
+                    if deadline is not None:
+                        if now >= deadline: return None
+                        wait = min(wait, deadline - now)
+                    self._cond.wait(wait)
+            finally:
+                if not background:
+                    self.waiting -= 1
+                    self._cond.notify_all()
+
+    def close(self):
+        # Wakes every waiter so worker threads can finish while the app exits
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def drain(self):
+        # The server throttled us: everyone waits for a fresh refill
+        with self._cond:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+
+class QuotaTracker:
+    # API calls this calendar month (UTC), persisted so the count survives restarts. Each save
+    # adds this process's unsaved calls to what is on disk, so parallel instances add up.
+    def __init__(self, path=None, monthly_limit=MONTHLY_QUOTA):
+        self.path = path
+        self.monthly_limit = monthly_limit
+        self.month = self._this_month()
+        self._lock = threading.Lock()
+        data = self._read()
+        self.saved = int(data.get("calls", 0))
+        self.unsaved = 0
+        self.exhausted = bool(data.get("exhausted", False))
+
+    @staticmethod
+    def _this_month():
+        return time.strftime("%Y-%m", time.gmtime())
+
+    def _read(self):
+        if not self.path: return {}
+        try:
+            with open(self.path, encoding="utf-8") as f: data = json.load(f)
+        except (OSError, ValueError): return {}
+        return data if isinstance(data, dict) and data.get("month") == self.month else {}
+
+    def _roll(self):
+        # Caller holds the lock. The plan's counter resets each month and so does ours
+        month = self._this_month()
+        if month != self.month:
+            self.month, self.saved, self.unsaved, self.exhausted = month, 0, 0, False
+
+    @property
+    def calls(self):
+        with self._lock:
+            self._roll()
+            return self.saved + self.unsaved
+
+    def remaining(self):
+        return max(0, self.monthly_limit - self.calls)
+
+    def is_low(self):
+        return self.exhausted or self.remaining() < self.monthly_limit * QUOTA_LOW_FRACTION
+
+    def record(self):
+        with self._lock:
+            self._roll()
+            self.unsaved += 1
+            due = self.unsaved >= QUOTA_SAVE_EVERY
+        if due: self.save()
+
+    def set_exhausted(self, exhausted):
+        with self._lock:
+            self._roll()
+            changed = self.exhausted != exhausted
+            self.exhausted = exhausted
+        if changed: self.save()
+
+    def save(self):
+        if not self.path: return
+        with self._lock:
+            self._roll()
+            calls = int(self._read().get("calls", 0)) + self.unsaved
+            data = {"month": self.month, "calls": calls, "limit": self.monthly_limit, "exhausted": self.exhausted}
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"Warning: could not save API quota ({e}).")
+                return
+            self.saved, self.unsaved = calls, 0
+
+
+class WeatherClient:
+    # One keep-alive requests.Session shared by every caller, so repeat calls
+    # reuse a warm TCP/TLS connection instead of handshaking each time.
+    def __init__(self, api_key, base_url=API_BASE_URL, pool_maxsize=POOL_MAXSIZE, cache=None, quota=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = cache if cache is not None else ResponseCache()
+        self.quota = quota if quota is not None else QuotaTracker()
+        self.limiter = TokenBucket()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": "WeatherWise"
+        })
+        self.stats = {"requests": 0, "total_ms": 0.0, "first_ms": None, "last_ms": None, "stale_served": 0, "coalesced": 0,
+                      "throttled": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+        self.breakers = {endpoint: CircuitBreaker() for endpoint in ENDPOINT_PATHS}
+        self._revalidator = ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS, thread_name_prefix="weather-revalidate")
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._closing = threading.Event()
+
+    def get(self, endpoint, query, timeout=DEFAULT_TIMEOUT):
+        if endpoint not in ENDPOINT_PATHS: raise ValueError(f"Invalid API endpoint: {endpoint}")
+        params = {"key": self.api_key, "q": query}
+        params.update(ENDPOINT_PARAMS.get(endpoint, {}))
+        start = time.perf_counter()
+        response = self.session.get(self.base_url + ENDPOINT_PATHS[endpoint], params=params, timeout=timeout)
+        self._record(time.perf_counter() - start)
+        self.quota.record()
+        return response
+
+    def fetch(self, endpoint, query, timeout=DEFAULT_TIMEOUT):
+        return self.fetch_entry(endpoint, query, timeout=timeout).data
+
+    def fetch_entry(self, endpoint, query, timeout=DEFAULT_TIMEOUT, on_update=None, background=False):
+        # Returns a CacheEntry; entry.is_fresh() is False when stale data was served.
+        # In that case a background refresh may run and on_update(entry) fires when it lands.
+        # background=True marks a refresh nobody is waiting on; it yields to searches.
+        entry = self.cache.get_entry(query, endpoint)
+        if entry is not None: return entry
+        stale = self.cache.get_stale(query, endpoint)
+        breaker = self.breakers[endpoint]
+        if stale is not None and (stale.age() < STALE_WHILE_REVALIDATE or breaker.state != "closed"):
+            self._count_stale()
+            self._revalidate(endpoint, query, timeout, on_update)
+            return stale
+        try:
+            return self._fetch_network(endpoint, query, timeout, background)
+        except requests.exceptions.RequestException as e:
+            if stale is None: raise
+            response = getattr(e, "response", None)
+            # A 4xx other than a quota refusal is about the query itself; the cache cannot answer it
+            if response is not None and response.status_code < 500 and not is_quota_error(response): raise
+            print(f"Offline: serving {endpoint} for '{query}' from cache ({int(stale.age())}s old). {e}")
+            self._count_stale()
+            return stale
+
+    def refresh(self, endpoint, query, timeout=DEFAULT_TIMEOUT, background=False):
+        # Always hits the network (no cache read) and stores the result for later callers
+        return self._fetch_network(endpoint, query, timeout, background)
+
+    def _fetch_network(self, endpoint, query, timeout, background=False):
+        # Single-flight: concurrent callers for the same (location, endpoint) share one request
+        key = (normalize_location(query), endpoint)
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader: pending = self._inflight[key] = Future()
+        if not leader:
+            with self._stats_lock: self.stats["coalesced"] += 1
+            try: return pending.result()
+            except RateLimitedError:
+                if background: raise
+                # We joined a background refresh that yielded to the budget; a search goes anyway
+                return self._fetch_uncoalesced(endpoint, query, timeout)
+        try:
+            entry = self._fetch_uncoalesced(endpoint, query, timeout, background)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(entry)
+            return entry
+        finally:
+            with self._inflight_lock: self._inflight.pop(key, None)
+
+    def _fetch_uncoalesced(self, endpoint, query, timeout, background=False):
+        if background and self.quota.is_low():
+            raise RateLimitedError(f"API quota low ({self.quota.remaining()} calls left this month), background refresh skipped.")
+        breaker = self.breakers[endpoint]
+        if not breaker.allow():
+            raise CircuitOpenError(f"{endpoint} API unavailable, retrying in {int(breaker.retry_in()) + 1}s.")
+        try:
+            response = self._send(endpoint, query, timeout, background, breaker)
+            if response.status_code < 500:
+                # A 4xx (e.g. unknown city) still means the service itself is healthy
+                breaker.record_success()
+            if response.status_code < 400: self.quota.set_exhausted(False)
+            elif api_error_code(response) in QUOTA_ERROR_CODES: self.quota.set_exhausted(True)
+            response.raise_for_status()
+            body = response.content
+            data = decode_payload(body)
+        except requests.exceptions.HTTPError: raise
+        except RateLimitedError:
+            breaker.cancel_probe()
+            raise
+        except requests.exceptions.Timeout:
+            breaker.record_failure()
+            raise requests.exceptions.ConnectionError("API request timed out.")
+        except requests.exceptions.ConnectionError as e:
+            breaker.record_failure()
+            raise requests.exceptions.ConnectionError(f"Network error: {e}")
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        except ValueError as e:
+            # A truncated or garbled body is a service fault, as response.json() used to report it
+            breaker.record_failure()
+            raise requests.exceptions.RequestException(f"Invalid JSON from {endpoint} API: {e}")
+        return self.cache.put(query, endpoint, data, body)
+
+    def _send(self, endpoint, query, timeout, background, breaker):
+        # One token per lookup, so retries do not eat the burst meant for the next search. 429s and
+        # 5xx are retried with exponential backoff and full jitter; every failed 5xx counts toward
+        # the breaker, and once it opens the retries stop. A 429 drains the bucket for everyone.
+        wait_limit = min(timeout, BACKGROUND_MAX_WAIT) if background else timeout
+        waited = self.limiter.acquire(wait_limit, background)
+        if waited is None:
+            raise RateLimitedError(f"Request rate limit reached, {endpoint} call not sent.")
+        if waited > 0.01:
+            with self._stats_lock: self.stats["throttled"] += 1
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            response = self.get(endpoint, query, timeout=timeout)
+            status = response.status_code
+            if status != 429 and status < 500: return response
+            if status == 429: self.limiter.drain()
+            else: breaker.record_failure()
+            delay = retry_delay(response, attempt)
+            if attempt == RETRY_ATTEMPTS or delay is None or breaker.state != "closed": return response
+            print(f"API {status} for {endpoint}, retry {attempt + 1}/{RETRY_ATTEMPTS} in {delay:.1f}s.")
+            with self._stats_lock: self.stats["retries"] += 1
+            if self._closing.wait(delay): return response
+
+    def _revalidate(self, endpoint, query, timeout, on_update):
+        key = (normalize_location(query), endpoint)
+        with self._revalidating_lock:
+            if key in self._revalidating: return
+            self._revalidating.add(key)
+        def _run():
+            try:
+                entry = self._fetch_network(endpoint, query, timeout, background=True)
+            except Exception as e:
+                print(f"Revalidation failed for {endpoint} '{query}': {e}")
+                return
+            finally:
+                with self._revalidating_lock: self._revalidating.discard(key)
+            if on_update: on_update(entry)
+        try: self._revalidator.submit(_run)
+        except RuntimeError:
+            # Executor already shut down during exit
+            with self._revalidating_lock: self._revalidating.discard(key)
+
+    def _count_stale(self):
+        with self._stats_lock:
+            self.stats["stale_served"] += 1
+
+    def _record(self, elapsed):
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["total_ms"] += elapsed_ms
+            self.stats["last_ms"] = elapsed_ms
+            if self.stats["first_ms"] is None: self.stats["first_ms"] = elapsed_ms
+
+    def close(self):
+        # Workers stuck in a token wait or a retry sleep return at once; a request already on
+        # the wire still runs to its timeout
+        self._closing.set()
+        self.limiter.close()
+        self._revalidator.shutdown(wait=False, cancel_futures=True)
+        self.quota.save()
+        self.session.close()
+
+
+# --- Shared Client ---
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def get_client(api_key):
+    # The app, the chatbot and any batch tooling share one pool of warm connections
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None or _shared_client.api_key != api_key:
+            _shared_client = WeatherClient(api_key, cache=ResponseCache(disk=_open_disk_cache(), decode=parse_payload),
+                                           quota=QuotaTracker(os.path.join(user_cache_dir(), QUOTA_FILE)))
+        return _shared_client
+
+def _open_disk_cache():
+    try:
+        return DiskCache()
+    except Exception as e:
+        # A read-only or locked cache dir only costs us warm starts
+        print(f"Warning: disk cache unavailable, using memory only ({e}).")
+        return None
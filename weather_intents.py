@@ -0,0 +1,142 @@
+import re
+from datetime import date
+
+# --- Token Tables ---
+# Whole-token matching: "hi" no longer fires on "this"/"which", nor "sun" on "sunday"
+INTENT_KEYWORDS = {
+    "greeting": ("hi", "hello", "hey", "greetings", "howdy"),
+    "temperature": ("temperature", "temp", "hot", "cold", "warm", "degrees", "chilly"),
+    "rain": ("rain", "raining", "rainy", "precipitation", "umbrella", "showers", "drizzle"),
+    "wind": ("wind", "windy", "breeze", "breezy", "gust", "gusts", "gusty"),
+    "sunrise": ("sunrise", "dawn", "sunup"),
+    "sunset": ("sunset", "dusk", "sundown"),
+    "sun": ("sun",),
+    "condition": ("weather", "forecast", "conditions", "condition", "outside", "sky")
+}
+SUN_RISE_WORDS = frozenset(("rise", "rises", "rising", "come", "comes", "up"))
+SUN_SET_WORDS = frozenset(("set", "sets", "setting", "go", "goes", "down"))
+# When several intents match, the first one in this order wins; greetings only win on their own
+INTENT_PRIORITY = ("temperature", "rain", "wind", "sunrise", "sunset", "sun", "condition", "greeting")
+DATA_INTENTS = frozenset(("temperature", "rain", "wind", "sunrise", "sunset", "sun", "condition"))
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+DAY_WORDS = {"today": 0, "tonight": 0, "now": 0, "tomorrow": 1}
+PART_OF_DAY_HOURS = {"morning": 9, "noon": 12, "midday": 12, "afternoon": 15, "evening": 19, "tonight": 21, "night": 21, "midnight": 0}
+CITY_PREPOSITIONS = frozenset(("in", "for", "at"))
+# "at" also introduces times and places that are not cities: "at night", "at home", "at the moment"
+CITY_STOP_WORDS = frozenset(
+    ("today", "tonight", "now", "tomorrow", "this", "next", "on", "at", "in", "for", "please", "right",
+     "day", "days", "week", "weekend", "the", "like", "be", "will", "is", "home", "work", "school", "office",
+     "moment", "present", "least", "all", "here", "there", "my", "me", "our")
+    + WEEKDAYS + tuple(PART_OF_DAY_HOURS) + tuple(word for words in INTENT_KEYWORDS.values() for word in words)
+)
+MAX_CITY_TOKENS = 4
+
+# Words are any Unicode letters ("são paulo", "zürich"), not just a-z
+TOKEN_RE = re.compile(r"\d{1,2}:\d{2}(?:\s*[ap]m)?|\d{1,2}\s*[ap]m|\d+|[^\W\d_]+(?:[-'][^\W\d_]+)*|[?.!,]")
+TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap]m)?$")
+
+# One table lookup per token: token -> ((role, value), ...)
+_TOKEN_TABLE = {}
+def _add_role(token, role, value=None):
+    _TOKEN_TABLE[token] = _TOKEN_TABLE.get(token, ()) + ((role, value),)
+
+for _intent, _words in INTENT_KEYWORDS.items():
+    for _word in _words: _add_role(_word, "intent", _intent)
+for _word, _offset in DAY_WORDS.items(): _add_role(_word, "day", _offset)
+for _index, _word in enumerate(WEEKDAYS): _add_role(_word, "weekday", _index)
+for _word, _hour in PART_OF_DAY_HOURS.items(): _add_role(_word, "hour", _hour)
+for _word in CITY_PREPOSITIONS: _add_role(_word, "city")
+for _word in SUN_RISE_WORDS: _add_role(_word, "rise")
+for _word in SUN_SET_WORDS: _add_role(_word, "set")
+_add_role("day", "day_after")
+
+class Query:
+    __slots__ = ("intent", "city", "day_offset", "hour", "weekday", "next_week")
+
+    def __init__(self, intent=None, city=None, day_offset=None, hour=None, weekday=None, next_week=False):
+        self.intent = intent
+        self.city = city
+        self.day_offset = day_offset
+        self.hour = hour
+        self.weekday = weekday # Monday = 0 when the day was named, so it can be re-counted
+        self.next_week = next_week
+
+    @property
+    def needs_city(self):
+        return self.intent in DATA_INTENTS
+
+    def offset_on(self, today):
+        # day_offset counted from `today`, e.g. the forecast location's date rather than this machine's
+        if self.weekday is None: return self.day_offset
+        return weekday_offset(self.weekday, self.next_week, today)
+
+    def __repr__(self):
+        return f"Query(intent={self.intent!r}, city={self.city!r}, day_offset={self.day_offset!r}, hour={self.hour!r})"
+
+
+def weekday_offset(weekday, next_week, today):
+    offset = (weekday - today.weekday()) % 7
+    return 7 if offset == 0 and next_week else offset
+
+def tokenize(message):
+    return TOKEN_RE.findall(message.lower())
+
+def parse_hour(token):
+    match = TIME_RE.match(token)
+    if not match: return None
+    hour, suffix = int(match.group(1)), match.group(3)
+    if suffix:
+        if not 1 <= hour <= 12: return None
+        hour = hour % 12 + (12 if suffix == "pm" else 0)
+    elif match.group(2) is None or hour > 23:
+        return None
+    return hour
+
+def parse(message, today=None):
+    # One tokenization pass; each token costs a single lookup in the precompiled table
+    tokens = tokenize(message)
+    found = set()
+    city = day_offset = hour = weekday = None
+    rise = sets = next_week = False
+    for i, token in enumerate(tokens):
+        roles = _TOKEN_TABLE.get(token)
+        if roles is None:
+            if token[0].isdigit():
+                parsed = parse_hour(token)
+                if parsed is None and i > 0 and tokens[i - 1] == "at" and token.isdigit() and int(token) <= 23:
+                    parsed = int(token)
+                if parsed is not None:
+                    if hour is None: hour = parsed
+                elif token.isdigit() and tokens[i - 1:i] == ["in"] and tokens[i + 1:i + 2] in (["days"], ["day"]):
+                    day_offset = int(token)
+            continue
+        for role, value in roles:
+            if role == "intent": found.add(value)
+            elif role == "day":
+                if day_offset is None: day_offset = value
+            elif role == "weekday":
+                if day_offset is None:
+                    weekday, next_week = value, i > 0 and tokens[i - 1] == "next"
+                    day_offset = weekday_offset(weekday, next_week, today or date.today())
+            elif role == "hour":
+                if hour is None: hour = value
+            elif role == "city":
+                if city is None: city = _read_city(tokens, i + 1)
+            elif role == "rise": rise = True
+            elif role == "set": sets = True
+            elif role == "day_after":
+                if tokens[i - 1:i] == ["the"] and tokens[i + 1:i + 3] == ["after", "tomorrow"]: day_offset = 2
+    if "sun" in found:
+        if rise: found.add("sunrise")
+        elif sets: found.add("sunset")
+    for name in INTENT_PRIORITY:
+        if name in found: return Query(name, city, day_offset, hour, weekday, next_week)
+    return Query(None, city, day_offset, hour, weekday, next_week)
+
+def _read_city(tokens, start):
+    words = []
+    for token in tokens[start:start + MAX_CITY_TOKENS]:
+        if token in CITY_STOP_WORDS or not token[0].isalpha(): break
+        words.append(token)
+    return " ".join(words) or None
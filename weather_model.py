@@ -0,0 +1,342 @@
+import calendar
+import json
+import math
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta
+
+try:
+    import orjson # Optional, much faster decoder
+except ImportError:
+    orjson = None
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+# --- Model Settings ---
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 24 * 60 * 60
+MISSING = math.nan # Stored in float columns for absent fields
+
+
+def local_seconds(text):
+    # "YYYY-MM-DD HH:MM" wall-clock time -> seconds since 1970-01-01 00:00 of that same wall clock.
+    # Plain slicing is several times faster than strptime and is done once per row at ingest.
+    try:
+        day = date(int(text[0:4]), int(text[5:7]), int(text[8:10])).toordinal() - EPOCH_ORDINAL
+        seconds = int(text[11:13]) * 3600 + int(text[14:16]) * 60 if len(text) >= 16 else 0
+    except (TypeError, ValueError):
+        return None
+    return day * SECONDS_PER_DAY + seconds
+
+def local_date(seconds):
+    return date.fromordinal(seconds // SECONDS_PER_DAY + EPOCH_ORDINAL)
+
+def format_clock(seconds):
+    rest = seconds % SECONDS_PER_DAY
+    return f"{rest // 3600:02d}:{rest % 3600 // 60:02d}"
+
+def format_hour(seconds):
+    # Same text as strftime("%a %H:%M") without building a datetime per row; 1970-01-01 was a Thursday
+    return f"{calendar.day_abbr[(seconds // SECONDS_PER_DAY + 3) % 7]} {format_clock(seconds)}"
+
+def format_value(value, missing="-"):
+    if value is None or (isinstance(value, float) and math.isnan(value)): return missing
+    return value
+
+def _float(value):
+    try: return float(value)
+    except (TypeError, ValueError): return MISSING
+
+def _int(value):
+    try: return int(value)
+    except (TypeError, ValueError): return 0
+
+
+# --- Conditions ---
+class Condition:
+    __slots__ = ("code", "text", "icon")
+
+    def __init__(self, code, text, icon):
+        self.code = code
+        self.text = text
+        self.icon = icon
+
+# Every report points into one shared table, so "Partly cloudy" is stored once for all cities
+_conditions = []
+_condition_ids = {}
+_conditions_lock = threading.Lock()
+
+def condition_id(raw):
+    raw = raw or {}
+    key = (raw.get('code', 0), raw.get('text', 'N/A'), raw.get('icon'))
+    found = _condition_ids.get(key)
+    if found is not None: return found
+    with _conditions_lock:
+        found = _condition_ids.get(key)
+        if found is None:
+            found = _condition_ids[key] = len(_conditions)
+            _conditions.append(Condition(*key))
+    return found
+
+def condition(index):
+    return _conditions[index]
+
+
+# --- Records ---
+class Location:
+    __slots__ = ("name", "region", "country", "lat", "lon", "tz_id", "localtime", "localtime_epoch")
+
+    def __init__(self, raw):
+        self.name = raw.get('name', '')
+        self.region = raw.get('region', '')
+        self.country = raw.get('country', '')
+        self.lat = _float(raw.get('lat'))
+        self.lon = _float(raw.get('lon'))
+        self.tz_id = raw.get('tz_id', '')
+        self.localtime = raw.get('localtime', '')
+        self.localtime_epoch = raw.get('localtime_epoch')
+
+    @property
+    def today(self):
+        # The calendar date there now, not when the payload was fetched: a stale-while-revalidate
+        # or offline report can be hours or days old
+        seconds = self.local_now()
+        return local_date(seconds) if seconds is not None else None
+
+    def local_now(self, now=None):
+        # Current wall clock at the location, as local_seconds(); the IANA zone tracks DST,
+        # the payload's offset is the fallback
+        now = time.time() if now is None else now
+        offset = None
+        if ZoneInfo is not None and self.tz_id:
+            try: offset = datetime.fromtimestamp(now, ZoneInfo(self.tz_id)).utcoffset().total_seconds()
+            except (KeyError, ValueError, OSError): offset = None # Unknown zone or no tzdata
+        if offset is None: offset = self.utc_offset
+        return int(now + offset) if offset is not None else None
+
+    @property
+    def utc_offset(self):
+        # Seconds east of UTC, from localtime vs localtime_epoch (rounded to 15 minutes)
+        seconds = local_seconds(self.localtime)
+        if seconds is None or self.localtime_epoch is None: return None
+        return round((seconds - self.localtime_epoch) / 900) * 900
+
+
+class Current:
+    __slots__ = ("temp_c", "feelslike_c", "humidity", "wind_kph", "pressure_mb", "vis_km", "is_day", "condition", "last_updated_epoch")
+
+    def __init__(self, raw):
+        self.temp_c = _float(raw.get('temp_c'))
+        self.feelslike_c = _float(raw.get('feelslike_c'))
+        self.humidity = raw.get('humidity') # Percent, an int in the payload
+        self.wind_kph = _float(raw.get('wind_kph'))
+        self.pressure_mb = _float(raw.get('pressure_mb'))
+        self.vis_km = _float(raw.get('vis_km'))
+        self.is_day = _int(raw.get('is_day', 1))
+        self.condition = condition(condition_id(raw.get('condition')))
+        self.last_updated_epoch = raw.get('last_updated_epoch')
+
+
+class Astro:
+    __slots__ = ("sunrise", "sunset", "moonrise", "moonset", "moon_phase", "moon_illumination")
+
+    def __init__(self, raw):
+        self.sunrise = raw.get('sunrise', '--:--')
+        self.sunset = raw.get('sunset', '--:--')
+        self.moonrise = raw.get('moonrise', '--:--')
+        self.moonset = raw.get('moonset', '--:--')
+        self.moon_phase = raw.get('moon_phase', 'N/A')
+        self.moon_illumination = raw.get('moon_illumination', '--')
+
+
+# --- Series ---
+class HourlySeries:
+    # One typed array per field instead of a dict per hour
+    __slots__ = ("time_epoch", "local_time", "temp_c", "wind_kph", "chance_of_rain", "humidity", "precip_mm", "is_day", "condition")
+
+    def __init__(self):
+        self.time_epoch = array('q')
+        self.local_time = array('q') # Wall-clock seconds, see local_seconds()
+        self.temp_c = array('d')
+        self.wind_kph = array('d')
+        self.chance_of_rain = array('B') # Percent
+        self.humidity = array('B')
+        self.precip_mm = array('d')
+        self.is_day = array('B')
+        self.condition = array('H') # Index into the shared condition table
+
+    def __len__(self):
+        return len(self.time_epoch)
+
+    def append(self, raw):
+        local = local_seconds(raw.get('time', ''))
+        if local is None: return False
+        self.time_epoch.append(_int(raw.get('time_epoch')))
+        self.local_time.append(local)
+        self.temp_c.append(_float(raw.get('temp_c')))
+        self.wind_kph.append(_float(raw.get('wind_kph')))
+        self.chance_of_rain.append(min(255, max(0, _int(raw.get('chance_of_rain')))))
+        self.humidity.append(min(255, max(0, _int(raw.get('humidity')))))
+        self.precip_mm.append(_float(raw.get('precip_mm')))
+        self.is_day.append(_int(raw.get('is_day', 1)))
+        self.condition.append(condition_id(raw.get('condition')))
+        return True
+
+    def extend(self, hours, day_start):
+        # Fast path for a well-formed day: one comprehension per column, no per-value conversions.
+        # Anything unexpected (missing key, null, out-of-range percent) sends the day through append().
+        try:
+            columns = (
+                ("time_epoch", array('q', [hour['time_epoch'] for hour in hours])),
+                ("local_time", array('q', [day_start + int(hour['time'][11:13]) * 3600 + int(hour['time'][14:16]) * 60 for hour in hours])),
+                ("temp_c", array('d', [hour['temp_c'] for hour in hours])),
+                ("wind_kph", array('d', [hour['wind_kph'] for hour in hours])),
+                ("chance_of_rain", array('B', [hour['chance_of_rain'] for hour in hours])),
+                ("humidity", array('B', [hour['humidity'] for hour in hours])),
+                ("precip_mm", array('d', [hour['precip_mm'] for hour in hours])),
+                ("is_day", array('B', [hour['is_day'] for hour in hours])),
+                ("condition", array('H', [condition_id(hour['condition']) for hour in hours]))
+            )
+        except (KeyError, TypeError, ValueError, OverflowError):
+            for hour in hours: self.append(hour)
+            return
+        for name, values in columns: getattr(self, name).extend(values)
+
+    def condition_at(self, row):
+        return _conditions[self.condition[row]]
+
+
+class DailySeries:
+    __slots__ = ("day", "maxtemp_c", "mintemp_c", "avgtemp_c", "maxwind_kph", "totalprecip_mm", "avghumidity",
+                 "chance_of_rain", "condition", "hour_start", "hour_count", "astro")
+
+    def __init__(self):
+        self.day = array('l') # Days since 1970-01-01 (local date)
+        self.maxtemp_c = array('d')
+        self.mintemp_c = array('d')
+        self.avgtemp_c = array('d')
+        self.maxwind_kph = array('d')
+        self.totalprecip_mm = array('d')
+        self.avghumidity = array('d')
+        self.chance_of_rain = array('B')
+        self.condition = array('H')
+        self.hour_start = array('l') # First row of this day in the hourly series
+        self.hour_count = array('B')
+        self.astro = []
+
+    def __len__(self):
+        return len(self.day)
+
+    def append(self, raw, hour_start, hour_count):
+        local = local_seconds(raw.get('date', ''))
+        if local is None: return False
+        info = raw.get('day', {})
+        self.day.append(local // SECONDS_PER_DAY)
+        self.maxtemp_c.append(_float(info.get('maxtemp_c')))
+        self.mintemp_c.append(_float(info.get('mintemp_c')))
+        self.avgtemp_c.append(_float(info.get('avgtemp_c')))
+        self.maxwind_kph.append(_float(info.get('maxwind_kph')))
+        self.totalprecip_mm.append(_float(info.get('totalprecip_mm')))
+        self.avghumidity.append(_float(info.get('avghumidity')))
+        self.chance_of_rain.append(min(255, max(0, _int(info.get('daily_chance_of_rain')))))
+        self.condition.append(condition_id(info.get('condition')))
+        self.hour_start.append(hour_start)
+        self.hour_count.append(hour_count)
+        self.astro.append(Astro(raw['astro']) if 'astro' in raw else None)
+        return True
+
+    def date_at(self, row):
+        return date.fromordinal(self.day[row] + EPOCH_ORDINAL)
+
+    def condition_at(self, row):
+        return _conditions[self.condition[row]]
+
+
+# --- Report ---
+class WeatherReport:
+    # Parsed once when a payload enters the memory cache; any of the parts may be None
+    # depending on the endpoint (current.json, forecast.json or astronomy.json)
+    __slots__ = ("location", "current", "hourly", "daily", "astro", "__weakref__")
+
+    def __init__(self, location=None, current=None, hourly=None, daily=None, astro=None):
+        self.location = location
+        self.current = current
+        self.hourly = hourly
+        self.daily = daily
+        self.astro = astro
+
+    @classmethod
+    def from_json(cls, data):
+        report = cls(location=Location(data.get('location', {})))
+        if 'current' in data: report.current = Current(data['current'])
+        days = data.get('forecast', {}).get('forecastday')
+        if days is not None:
+            report.hourly, report.daily = HourlySeries(), DailySeries()
+            for day in days:
+                start = len(report.hourly)
+                day_start = local_seconds(day.get('date', ''))
+                hours = day.get('hour', [])
+                if day_start is None:
+                    for hour in hours: report.hourly.append(hour)
+                else:
+                    report.hourly.extend(hours, day_start)
+                report.daily.append(day, start, len(report.hourly) - start)
+            if report.daily.astro: report.astro = report.daily.astro[0]
+        if 'astronomy' in data and 'astro' in data['astronomy']:
+            report.astro = Astro(data['astronomy']['astro'])
+        return report
+
+    @property
+    def today(self):
+        today = self.location.today if self.location else None
+        if today is None and self.daily: today = self.daily.date_at(0)
+        return today
+
+    def day(self, day_offset=0):
+        # Row of the daily series for today + day_offset, or None
+        if not self.daily: return None
+        today = self.today
+        if today is None: return None
+        target = today.toordinal() - EPOCH_ORDINAL + (day_offset or 0)
+        row = target - self.daily.day[0]
+        if 0 <= row < len(self.daily) and self.daily.day[row] == target: return row
+        # Only a series with gaps gets here; it is a handful of days long
+        for index, value in enumerate(self.daily.day):
+            if value == target: return index
+        return None
+
+    def hour(self, day_offset, hour):
+        day_row = self.day(day_offset)
+        if day_row is None or not 0 <= hour < 24: return None
+        start, count = self.daily.hour_start[day_row], self.daily.hour_count[day_row]
+        # Hours are listed 00:00..23:00, so the row is start + hour unless the day is incomplete
+        row = start + hour
+        if hour < count and self.hourly.local_time[row] % SECONDS_PER_DAY // 3600 == hour: return row
+        for row in range(start, start + count):
+            if self.hourly.local_time[row] % SECONDS_PER_DAY // 3600 == hour: return row
+        return None
+
+    def describe(self, day_offset, hour=None):
+        day_offset = day_offset or 0
+        if day_offset == 0: when = "today"
+        elif day_offset == 1: when = "tomorrow"
+        elif self.today is not None: when = f"on {(self.today + timedelta(days=day_offset)).strftime('%A')}"
+        else: when = f"in {day_offset} days"
+        if hour is not None: when += f" at {hour:02d}:00"
+        return when
+
+
+# --- Ingest ---
+def decode_payload(body):
+    # response.content -> dict. Decoding the bytes directly skips requests' charset sniffing
+    # and the str copy behind response.json(); field selection happens in WeatherReport.from_json
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def parse_payload(endpoint, data):
+    # Decode hook for ResponseCache: the memory cache keeps reports, the disk cache keeps JSON
+    return WeatherReport.from_json(data)